@@ -8,11 +8,18 @@ __status__ = "Finished"
 """
 
 import re
+import string
 from collections import Counter
 
+ALPHABET = string.ascii_lowercase
+NON_LETTERS = re.compile('[^a-zA-Z]')
+
 
 class Caesar:
 
+    # Alle 26 Verschiebungstabellen werden einmalig beim Laden der Klasse berechnet.
+    _shift_tables = [str.maketrans(ALPHABET, ALPHABET[i:] + ALPHABET[:i]) for i in range(26)]
+
     def __init__(self, key: chr = 'a'):
         """
         Konstruktor
@@ -40,7 +47,7 @@ class Caesar:
         >>> caesar.to_lowercase_letter_only("Wandelt den plaintext in Kleinbuchstaben um und entfernt alle Zeichen, die keine Kleinbuchstaben aus dem Bereich [a..z] sind.")
         'wandeltdenplaintextinkleinbuchstabenumundentferntallezeichendiekeinekleinbuchstabenausdembereichazsind'
         """
-        return ''.join([c.lower() for c in plaintext if re.compile('[a-zA-Z]').match(c)])
+        return NON_LETTERS.sub('', plaintext).lower()
 
     def encrypt(self, plaintext: str, key: str = None) -> str:
         """key ist ein Buchstabe, der definiert, um wieviele Zeichen verschoben wird.
@@ -63,12 +70,7 @@ class Caesar:
         key = key.lower()
         plaintext = self.to_lowercase_letter_only(plaintext)
 
-        for i in range(len(plaintext)):
-            if plaintext[i].isalpha():
-                plaintext = plaintext[:i] + chr((ord(plaintext[i]) + (ord(key) - 97) - 97) % 26 + 97) + plaintext[
-                                                                                                i + 1:]
-
-        return plaintext
+        return plaintext.translate(Caesar._shift_tables[(ord(key) - ord('a')) % 26])
 
     def decrypt(self, crypttext: str, key=None) -> str:
         """
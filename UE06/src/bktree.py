@@ -0,0 +1,172 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import random
+from typing import Callable, Iterable, List, Set, Tuple
+
+
+def damerau_levenshtein(a: str, b: str, max_distance: int = None) -> int:
+    """
+    Berechnet die Damerau-Levenshtein-Distanz (Löschen, Einfügen, Ersetzen, Verdrehen benachbarter Buchstaben,
+    auch wenn dazwischen weiter editiert wird). Im Gegensatz zur OSA-Distanz (bitparallel_distance) ist das eine Metrik
+    (Dreiecksungleichung), was der BK-Baum voraussetzt. Das Minimum einer Zeile der Matrix kann nicht mehr
+    kleiner werden, daher wird mit max_distance abgebrochen, sobald es größer ist (Ergebnis max_distance + 1).
+    :param a: erstes Wort
+    :param b: zweites Wort
+    :param max_distance: obere Schranke (None = keine)
+    :return: Distanz
+    >>> damerau_levenshtein('hallo', 'hlalo')
+    1
+    >>> damerau_levenshtein('ca', 'abc')
+    2
+    >>> damerau_levenshtein('', 'abc')
+    3
+    >>> damerau_levenshtein('hallo', 'lupe', 2)
+    3
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    infinity = len(a) + len(b)
+    last_row = {}
+    # Matrix mit einer zusätzlichen Zeile und Spalte (infinity) am Rand.
+    d = [[infinity] * (len(b) + 2)] + [[infinity] + [0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i + 1][1] = i
+    for j in range(len(b) + 1):
+        d[1][j + 1] = j
+
+    for i in range(1, len(a) + 1):
+        last_col = 0
+        for j in range(1, len(b) + 1):
+            k = last_row.get(b[j - 1], 0)
+            l = last_col
+            if a[i - 1] == b[j - 1]:
+                cost = 0
+                last_col = j
+            else:
+                cost = 1
+            d[i + 1][j + 1] = min(d[i][j] + cost, d[i + 1][j] + 1, d[i][j + 1] + 1,
+                                  d[k][l] + (i - k - 1) + 1 + (j - l - 1))
+        last_row[a[i - 1]] = i
+        if max_distance is not None and min(d[i + 1][1:]) > max_distance:
+            return max_distance + 1
+    if max_distance is not None:
+        return min(d[len(a) + 1][len(b) + 1], max_distance + 1)
+    return d[len(a) + 1][len(b) + 1]
+
+
+class BKTree:
+    """
+    BK-Baum über einem Wörterbuch: jeder Knoten ist ein Wort, seine Kinder sind nach ihrer Distanz zu diesem
+    Wort abgelegt. Bei einer Suche mit Distanz d zum Knoten und Schranke max_distance kommen wegen der
+    Dreiecksungleichung nur Kinder mit Kante in [d - max_distance, d + max_distance] in Frage, alle anderen
+    Zweige werden gar nicht besucht. Es werden also nur echte Wörterbuch-Wörter verglichen, für jede beliebige
+    max_distance. Verhält sich wie eine Menge von Wörtern und kann daher als alle_woerter verwendet werden.
+    """
+
+    def __init__(self, words: Iterable[str], distance: Callable[[str, str, int], int] = damerau_levenshtein):
+        """
+        Konstruktor. Die Wörter werden in einer festen, zufälligen Reihenfolge eingefügt, sortierte Eingaben
+        würden sonst einen sehr tiefen Baum ergeben.
+        :param words: Die Wörter des Wörterbuchs.
+        :param distance: Metrik auf Wörtern, mit einer Schranke als drittem Parameter (siehe damerau_levenshtein)
+        """
+        self.__words = frozenset(words)
+        self.__distance = distance
+        self.__root = None
+
+        order = sorted(self.__words)
+        random.Random(0).shuffle(order)
+        for word in order:
+            self.__add(word)
+
+    def __add(self, word: str):
+        """
+        Fügt ein Wort ein. Ein Knoten ist eine Liste [wort, {distanz: kind}].
+        """
+        if self.__root is None:
+            self.__root = [word, {}]
+            return
+        node = self.__root
+        while True:
+            d = self.__distance(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = [word, {}]
+                return
+            node = child
+
+    @property
+    def words(self) -> frozenset:
+        """
+        Die Wörter des Wörterbuchs.
+        """
+        return self.__words
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.__words
+
+    def __iter__(self):
+        return iter(self.__words)
+
+    def __len__(self) -> int:
+        return len(self.__words)
+
+    def lookup(self, word: str, max_distance: int = 2) -> List[Tuple[str, int]]:
+        """
+        Findet alle Wörter mit Distanz höchstens max_distance.
+        :param word: Das Eingangswort.
+        :param max_distance: größte Distanz (beliebig)
+        :return: nach Distanz und Wort sortierte Liste von (wort, distanz)
+        >>> tree = BKTree(['hallo', 'halle', 'aalsuppe', 'lupe', 'hund'])
+        >>> tree.lookup('haalo')
+        [('hallo', 1), ('halle', 2)]
+        >>> tree.lookup('haalo', 0)
+        []
+        >>> [w for w, _ in tree.lookup('hallo', 4)]
+        ['hallo', 'halle', 'hund']
+        """
+        word = word.lower()
+        found = []
+        stack = [self.__root] if self.__root is not None else []
+        while stack:
+            node = stack.pop()
+            # Ab dieser Distanz passt keine Kante mehr, genauer muss nicht gerechnet werden.
+            limit = max(node[1], default=0) + max_distance
+            d = self.__distance(word, node[0], limit)
+            if d <= max_distance:
+                found.append((node[0], d))
+            for edge, child in node[1].items():
+                if d - max_distance <= edge <= d + max_distance:
+                    stack.append(child)
+        return sorted(found, key=lambda x: (x[1], x[0]))
+
+    def correct(self, word: str, max_distance: int = 2) -> Set[str]:
+        """
+        Wie spellcheck.correct: das Wort selbst, sonst alle Wörter mit der kleinsten Distanz
+        (höchstens max_distance), sonst das ursprüngliche Wort.
+        :param word: Das Eingangswort.
+        :param max_distance: größte Distanz
+        :return: Mögliche Korrekturen.
+        >>> tree = BKTree(['hallo', 'halle', 'aalsuppe', 'lupe'])
+        >>> tree.correct('Haalo')
+        {'hallo'}
+        >>> tree.correct('Aalsupe'), tree.correct('Xaalsupxe', 3)
+        ({'aalsuppe'}, {'aalsuppe'})
+        """
+        word = word.lower()
+        if word in self.__words:
+            return {word}
+        hits = self.lookup(word, max_distance)
+        if not hits:
+            return {word}
+        return {w for w, d in hits if d == hits[0][1]}
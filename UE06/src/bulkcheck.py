@@ -0,0 +1,186 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import argparse
+import errno
+import json
+import multiprocessing
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Set
+
+from spellcheck import correct, load_words
+
+# Buchstabenfolgen (inklusive Umlaute), Ziffern und Unterstriche trennen Wörter.
+WORD = re.compile(r"[^\W\d_]+")
+
+# Anzahl der Wörter, die ein Worker pro Auftrag korrigiert.
+CHUNK_SIZE = 256
+
+# Wörterbuch der Worker. Beim Start mit fork wird es vom Hauptprozess geerbt und nicht neu geladen.
+_woerter = None
+
+
+def tokenize(line: str) -> List[str]:
+    """
+    Zerlegt eine Zeile in Wörter (in Kleinbuchstaben).
+    :param line: Textzeile
+    :return: Liste der Wörter
+    >>> tokenize("Die Straße, 2 Häuser und_ein Baum!")
+    ['die', 'straße', 'häuser', 'und', 'ein', 'baum']
+    """
+    return [word.lower() for word in WORD.findall(line)]
+
+
+def count_words(lines: Iterable[str]) -> Counter:
+    """
+    Zählt alle Wörter eines Textes, der zeilenweise gelesen wird (z.B. eine geöffnete Datei).
+    :param lines: Zeilen des Textes
+    :return: Counter wort -> anzahl
+    >>> count_words(["Der Hund und der Hase.", "Der Hund!"]).most_common(2)
+    [('der', 3), ('hund', 2)]
+    """
+    counts = Counter()
+    for line in lines:
+        counts.update(tokenize(line))
+    return counts
+
+
+def _init_worker(wordlist: str, index: bool):
+    """
+    Initialisierung eines Worker-Prozesses: lädt das Wörterbuch nur, wenn es nicht schon geerbt wurde.
+    """
+    global _woerter
+    if _woerter is None:
+        _woerter = load_words(wordlist, index)
+
+
+def _correct_chunk(words: List[str]) -> Dict[str, Set[str]]:
+    """
+    Korrigiert einen Block von Wörtern im Worker.
+    """
+    return {word: correct(word, _woerter) for word in words}
+
+
+def correct_all(words: Iterable[str], wordlist: str, index: bool = True, jobs: int = None,
+                chunk_size: int = CHUNK_SIZE) -> Dict[str, Set[str]]:
+    """
+    Korrigiert jedes Wort genau einmal. Wörter aus dem Wörterbuch werden schon im Hauptprozess aussortiert,
+    die übrigen werden blockweise auf einen ProcessPoolExecutor verteilt. Das Wörterbuch wird einmal im
+    Hauptprozess geladen; mit fork teilen sich die Worker den Speicher, sonst lädt jeder die kompilierte Datei.
+    :param words: Wörter (ohne Wiederholungen, z.B. die Schlüssel von count_words)
+    :param wordlist: Pfad zur Wortliste
+    :param index: True, um den SymSpell-Index zu verwenden
+    :param jobs: Anzahl der Worker-Prozesse (None = Anzahl der CPUs, 1 = ohne Prozesse)
+    :param chunk_size: Anzahl der Wörter pro Auftrag
+    :return: dict wort -> korrekturen, nur für Wörter, die nicht im Wörterbuch sind
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+    ...     _ = file.write('der hund und hase')
+    >>> correct_all(['der', 'hnud', 'haase'], file.name, jobs=1)
+    {'hnud': {'hund'}, 'haase': {'hase'}}
+    >>> for path in [file.name, file.name + '.index.compiled']: os.unlink(path)
+    """
+    global _woerter
+    _woerter = load_words(wordlist, index)
+    if _woerter is FileNotFoundError:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), wordlist)
+
+    unknown = [word for word in words if word not in _woerter]
+    chunks = [unknown[i:i + chunk_size] for i in range(0, len(unknown), chunk_size)]
+    corrections = {}
+    if jobs == 1:
+        for chunk in chunks:
+            corrections.update(_correct_chunk(chunk))
+        return corrections
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with ProcessPoolExecutor(jobs, context, _init_worker, (wordlist, index)) as executor:
+        for result in executor.map(_correct_chunk, chunks):
+            corrections.update(result)
+    return corrections
+
+
+def annotate(line: str, corrections: Dict[str, Set[str]]) -> str:
+    """
+    Markiert in einer Zeile alle Wörter, für die es Korrekturen gibt, als wort{vorschlag|vorschlag}.
+    Wörter ohne Vorschlag (correct liefert das Wort selbst) werden als wort{?} markiert.
+    :param line: Textzeile
+    :param corrections: Ergebnis von correct_all
+    :return: markierte Zeile
+    >>> annotate("Der Hnud bellt.", {'hnud': {'hund'}, 'bellt': {'bellt'}})
+    'Der Hnud{hund} bellt{?}.'
+    """
+    def mark(match):
+        word = match.group(0)
+        suggestions = corrections.get(word.lower())
+        if suggestions is None:
+            return word
+        suggestions = sorted(suggestions - {word.lower()})
+        return f"{word}{{{'|'.join(suggestions) or '?'}}}"
+
+    return WORD.sub(mark, line)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Spellcheck a whole document: every distinct word is corrected once, "
+                                                 "in parallel.")
+    parser.add_argument("infile", type=str, help="Text file to check")
+    parser.add_argument('-d', '--dictionary', type=str, required=True, help='Word list (e.g. de-en.txt)')
+    parser.add_argument('-a', '--annotate', type=str, metavar='FILE',
+                        help="Write the text with suggestions as word{suggestion|...} to FILE ('-' = stdout)")
+    parser.add_argument('-r', '--report', type=str, metavar='FILE',
+                        help="Write one JSON line per unknown word (word, count, suggestions) to FILE ('-' = stdout, "
+                             "default if --annotate is not given)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--no-index', action='store_true', help='Use edit1/edit2 instead of the SymSpell index')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Print statistics to stderr')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        with open(args.infile, 'r', encoding='utf-8') as file:
+            counts = count_words(file)
+        corrections = correct_all(counts, args.dictionary, not args.no_index, args.jobs)
+    except FileNotFoundError as e:
+        print(f"{e.filename}: No such file or directory", file=sys.stderr)
+        sys.exit(1)
+
+    if args.verbose:
+        print(f"{sum(counts.values())} words, {len(counts)} distinct, {len(corrections)} unknown", file=sys.stderr)
+
+    if args.report or not args.annotate:
+        out = sys.stdout if args.report in [None, '-'] else open(args.report, 'w', encoding='utf-8')
+        try:
+            for word in sorted(corrections, key=lambda w: (-counts[w], w)):
+                out.write(json.dumps({'word': word, 'count': counts[word],
+                                      'suggestions': sorted(corrections[word] - {word})}, ensure_ascii=False) + '\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    if args.annotate:
+        out = sys.stdout if args.annotate == '-' else open(args.annotate, 'w', encoding='utf-8')
+        try:
+            with open(args.infile, 'r', encoding='utf-8') as file:
+                for line in file:
+                    out.write(annotate(line, corrections))
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+
+if __name__ == '__main__':
+    main()
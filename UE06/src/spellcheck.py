@@ -7,7 +7,20 @@ __license__ = "GPL"
 __status__ = "Development"
 """
 
-from typing import Set, List, Tuple
+import hashlib
+import heapq
+import os
+import pickle
+import tempfile
+from collections import Counter
+from typing import Dict, Set, List, Tuple
+
+from bktree import BKTree
+from symspell import SymSpell, bitparallel_distance
+
+# Muss erhöht werden, sobald sich das Format der kompilierten Wörterbücher ändert.
+COMPILED_VERSION = 2
+COMPILED_SUFFIX = '.compiled'
 
 
 def read_all_words(filename: str) -> set or FileNotFoundError:
@@ -36,6 +49,168 @@ def read_all_words(filename: str) -> set or FileNotFoundError:
     return word_set
 
 
+def file_signature(filename: str) -> Tuple[int, int, str]:
+    """
+    Liefert Änderungszeit, Größe und SHA-256 einer Datei.
+    :param filename: Pfad zur Datei
+    :return: (mtime_ns, groesse, sha256)
+    """
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        while block := file.read(1 << 20):
+            sha.update(block)
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size, sha.hexdigest()
+
+
+def read_word_counts(filename: str) -> Counter or FileNotFoundError:
+    """
+    Wie read_all_words, zählt aber zusätzlich, wie oft jedes Wort in der Datei vorkommt (Häufigkeitsmodell).
+    :param filename: Pfad zur Datei
+    :return: Counter wort -> anzahl
+    >>> read_word_counts('de-en.txt')
+    Die Datei de-en.txt wurde nicht gefunden.
+    <class 'FileNotFoundError'>
+    """
+    counts = Counter()
+
+    try:
+        with open(filename, 'r', encoding='utf-8') as file:
+            for line in file:
+                counts.update(word.lower() for word in line.split())
+    except FileNotFoundError:
+        print(f'Die Datei {filename} wurde nicht gefunden.')
+        return FileNotFoundError
+
+    return counts
+
+
+def compiled_path(filename: str, kind: str = 'words') -> str:
+    """
+    Pfad der kompilierten Datei zu einer Wortliste, getrennt nach Art der Daten.
+    :param filename: Pfad zur Wortliste
+    :param kind: 'words' (frozenset), 'index' (SymSpell) oder 'counts' (Counter)
+    :return: Pfad der kompilierten Datei
+    >>> compiled_path('de-en.txt'), compiled_path('de-en.txt', 'index')
+    ('de-en.txt.compiled', 'de-en.txt.index.compiled')
+    """
+    return filename + ('' if kind == 'words' else '.' + kind) + COMPILED_SUFFIX
+
+
+def compile_words(filename: str, kind: str = 'words', target: str = None):
+    """
+    Liest die Wortliste und speichert sie als frozenset ('words'), SymSpell-Index ('index') oder
+    Häufigkeitsmodell ('counts') in einer Binärdatei. Diese enthält zuerst einen Header (Version, Art,
+    mtime, Größe und SHA-256 der Quelldatei), danach die Daten, beides mit pickle.
+    Kann die Datei nicht geschrieben werden, wird nur das Ergebnis geliefert.
+    :param filename: Pfad zur Wortliste
+    :param kind: 'words', 'index' oder 'counts'
+    :param target: Pfad der kompilierten Datei (None = siehe compiled_path)
+    :return: die Daten (frozenset, SymSpell oder Counter)
+    """
+    data = read_word_counts(filename) if kind == 'counts' else read_all_words(filename)
+    if data is FileNotFoundError:
+        return FileNotFoundError
+    if kind == 'index':
+        data = SymSpell(data)
+    elif kind == 'words':
+        data = frozenset(data)
+
+    write_compiled(filename, data, kind, target or compiled_path(filename, kind))
+    return data
+
+
+def write_compiled(filename: str, data, kind: str, target: str):
+    """
+    Schreibt Header und Daten (siehe compile_words) zuerst in eine eigene temporäre Datei im Zielordner und
+    benennt sie dann um. Ein abgebrochener Lauf hinterlässt also nie eine halbe Datei, und parallele Läufe
+    kommen sich nicht in die Quere. Fehler beim Schreiben werden ignoriert.
+    :param filename: Pfad zur Wortliste
+    :param data: die Daten (frozenset, SymSpell oder Counter)
+    :param kind: 'words', 'index' oder 'counts'
+    :param target: Pfad der kompilierten Datei
+    """
+    mtime, size, sha = file_signature(filename)
+    header = {'version': COMPILED_VERSION, 'mtime': mtime, 'size': size, 'sha256': sha, 'kind': kind}
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target) or '.', suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(header, file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def load_compiled(filename: str, kind: str = 'words', target: str = None):
+    """
+    Lädt die kompilierte Datei von compile_words, solange sie zur Quelldatei passt. Stimmen mtime und Größe
+    nicht mehr, wird der SHA-256 verglichen: bei gleichem Inhalt wird nur der Header erneuert, sonst wird
+    neu kompiliert.
+    :param filename: Pfad zur Wortliste
+    :param kind: 'words', 'index' oder 'counts'
+    :param target: Pfad der kompilierten Datei (None = siehe compiled_path)
+    :return: die Daten (frozenset, SymSpell oder Counter)
+    """
+    target = target or compiled_path(filename, kind)
+    try:
+        stat = os.stat(filename)
+        with open(target, 'rb') as file:
+            header = pickle.load(file)
+            if header.get('version') == COMPILED_VERSION and header.get('kind') == kind:
+                if (header['mtime'], header['size']) == (stat.st_mtime_ns, stat.st_size):
+                    return pickle.load(file)
+                if header['size'] == stat.st_size and header['sha256'] == file_signature(filename)[2]:
+                    # Nur die Änderungszeit hat sich geändert: Header erneuern, ohne neu zu parsen.
+                    data = pickle.load(file)
+                    write_compiled(filename, data, kind, target)
+                    return data
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+        pass
+
+    return compile_words(filename, kind, target)
+
+
+def load_words(filename: str, index: bool = False, target: str = None) -> frozenset or SymSpell or FileNotFoundError:
+    """
+    Wie read_all_words, verwendet aber die kompilierte Datei (siehe load_compiled).
+    :param filename: Pfad zur Wortliste
+    :param index: True, um einen SymSpell-Index zu liefern
+    :param target: Pfad der kompilierten Datei (None = siehe compiled_path)
+    :return: die Wörter (frozenset oder SymSpell)
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+    ...     _ = file.write('Hallo Welt\\nhallo Paul')
+    >>> sorted(load_words(file.name))
+    ['hallo', 'paul', 'welt']
+    >>> os.path.exists(compiled_path(file.name))
+    True
+    >>> load_words(file.name, index=True).correct('Haalo')
+    {'hallo'}
+    >>> load_word_counts(file.name)['hallo']
+    2
+    >>> for kind in ['words', 'index', 'counts']: os.unlink(compiled_path(file.name, kind))
+    >>> os.unlink(file.name)
+    """
+    return load_compiled(filename, 'index' if index else 'words', target)
+
+
+def load_word_counts(filename: str, target: str = None) -> Counter or FileNotFoundError:
+    """
+    Wie read_word_counts, verwendet aber die kompilierte Datei (siehe load_compiled).
+    :param filename: Pfad zur Wortliste
+    :param target: Pfad der kompilierten Datei (None = siehe compiled_path)
+    :return: Counter wort -> anzahl
+    """
+    return load_compiled(filename, 'counts', target)
+
+
 def split_word(wort: str) -> List[Tuple[str, str]]:
     """
     Teilt ein Wort in alle möglichen Paare von Wörtern auf. Und speichert sie als Tupel in einer Liste.
@@ -73,6 +248,27 @@ def edit1(wort: str) -> Set[str]:
     return result_set
 
 
+def as_set(alle_woerter) -> Set[str]:
+    """
+    Liefert das Wörterbuch als Menge. Mengen (und SymSpell/BKTree) werden nicht kopiert, nur Listen umgewandelt,
+    von einem dict (z.B. load_word_counts) werden die Schlüssel verwendet.
+    :param alle_woerter: Das Wörterbuch.
+    :return: Menge aller Wörter
+    >>> woerter = {'hallo'}
+    >>> as_set(woerter) is woerter
+    True
+    >>> as_set(['hallo', 'hallo'])
+    {'hallo'}
+    """
+    if isinstance(alle_woerter, (SymSpell, BKTree)):
+        return alle_woerter.words
+    if isinstance(alle_woerter, (set, frozenset)):
+        return alle_woerter
+    if isinstance(alle_woerter, dict):
+        return alle_woerter.keys()
+    return set(alle_woerter)
+
+
 def edit1_good(wort: str, alle_woerter: List[str]) -> Set[str]:
     """
     Ruft edit1 auf und filtert nach Wörtern die in der Liste alle_woerter enthalten sind.
@@ -85,7 +281,7 @@ def edit1_good(wort: str, alle_woerter: List[str]) -> Set[str]:
     """
     edit1_result = edit1(wort.lower())
 
-    return set(edit1_result) & set(alle_woerter)
+    return edit1_result & as_set(alle_woerter)
 
 
 def edit2_good(wort: str, alle_woerter: List[str]) -> Set[str]:
@@ -104,7 +300,7 @@ def edit2_good(wort: str, alle_woerter: List[str]) -> Set[str]:
     for word in edit1_result:
         edit2_result.update(edit1(word.lower()))
 
-    valid_edit2_words = set(edit2_result) & set(alle_woerter)
+    valid_edit2_words = edit2_result & as_set(alle_woerter)
 
     return valid_edit2_words
 
@@ -116,8 +312,10 @@ def correct(word: str, alle_woerter: List[str]) -> Set[str]:
     - oder (mindestens) ein Wort mit Edit-Distanz eins ist im Wörterbuch (Ergebnis: Liste dieser Wörter)
     - oder (mindestens) ein Wort mit Edit-Distanz zwei ist im Wörterbuch (Ergebnis: Liste dieser Wörter)
     - oder wir haben keine Idee (zu viele Fehler oder unbekanntes Wort): liefere eine Liste mit dem ursprünglichen Wort
+    edit2_good wird nur aufgerufen, wenn edit1_good nichts findet. Ist alle_woerter ein SymSpell-Index
+    oder ein BKTree, werden die Kandidaten dort nachgeschlagen, statt alle Edits zu erzeugen.
     :param word: Das Eingangswort.
-    :param alle_woerter: Das Wörterbuch.
+    :param alle_woerter: Das Wörterbuch (Menge, Liste, SymSpell oder BKTree).
     :return: Mögliche Korrekturen.
     >>> alle_woerter = read_all_words('/Users/paulwaldecker/Desktop/HTL3R/4CN/SEW/Angaben/06_py_comprehension/de-en.txt')
     >>> correct("Aalsuppe", alle_woerter)
@@ -126,16 +324,76 @@ def correct(word: str, alle_woerter: List[str]) -> Set[str]:
     {'aalsuppe'}
     >>> sorted(correct("Alsupe", alle_woerter))
     ['aalsuppe', 'absude', 'alse', 'lupe']
+    >>> correct("Haalo", SymSpell(['hallo', 'halle']))
+    {'hallo'}
+    >>> correct("Hlalo", BKTree(['hallo', 'halle']))
+    {'hallo'}
     """
     word = word.lower()
+    if isinstance(alle_woerter, (SymSpell, BKTree)):
+        return alle_woerter.correct(word)
+    alle_woerter = as_set(alle_woerter)
     if word in alle_woerter:
         return {word}
     else:
-        corrections_edit1 = edit1_good(word, alle_woerter)
-        corrections_edit2 = edit2_good(word, alle_woerter)
-        return corrections_edit1 or corrections_edit2 or {word}
+        return edit1_good(word, alle_woerter) or edit2_good(word, alle_woerter) or {word}
+
+
+def correct_ranked(word: str, alle_woerter, k: int = 3, frequencies: Dict[str, int] = None,
+                   max_distance: int = 2) -> List[str]:
+    """
+    Wie correct, liefert aber die k besten Korrekturen in Reihenfolge: zuerst nach Edit-Distanz,
+    bei gleicher Distanz nach Häufigkeit im Korpus (siehe load_word_counts), dann alphabetisch.
+    Die Kandidaten werden nach Häufigkeit sortiert geprüft, die besten k liegen in einem Heap. Ist der
+    Heap voll, muss ein späterer Kandidat strikt näher sein als der schlechteste im Heap, daher wird die
+    Distanz nur bis zu dieser Schranke berechnet (bitparallel_distance bricht vorher ab).
+    :param word: Das Eingangswort.
+    :param alle_woerter: Das Wörterbuch (Menge, Liste, Counter, SymSpell oder BKTree).
+    :param k: Anzahl der Korrekturen
+    :param frequencies: dict wort -> anzahl (None = alle_woerter, wenn es ein Counter ist, sonst keine)
+    :param max_distance: größte Edit-Distanz
+    :return: Liste der besten Korrekturen, sonst eine Liste mit dem ursprünglichen Wort
+    >>> counts = Counter({'hallo': 5, 'halle': 9, 'halo': 1, 'lupe': 3})
+    >>> correct_ranked('Hal', counts)
+    ['halo', 'halle', 'hallo']
+    >>> correct_ranked('hale', counts, 2)
+    ['halle', 'halo']
+    >>> correct_ranked('hale', SymSpell(counts), 2, counts), correct_ranked('hale', BKTree(counts), 2, counts)
+    (['halle', 'halo'], ['halle', 'halo'])
+    >>> correct_ranked('Quatsch', counts)
+    ['quatsch']
+    """
+    word = word.lower()
+    if frequencies is None:
+        frequencies = alle_woerter if isinstance(alle_woerter, dict) else {}
+
+    if isinstance(alle_woerter, SymSpell):
+        candidates = alle_woerter.candidates(word, max_distance)
+    elif isinstance(alle_woerter, BKTree):
+        candidates = {w for w, _ in alle_woerter.lookup(word, max_distance)}
+    else:
+        alle_woerter = as_set(alle_woerter)
+        candidates = edit1_good(word, alle_woerter) | ({word} & alle_woerter)
+        if max_distance >= 2:
+            candidates |= edit2_good(word, alle_woerter)
+
+    # Heap mit (-distanz, -rang, wort): heap[0] ist der schlechteste der bisher besten k.
+    heap = []
+    for rank, candidate in enumerate(sorted(candidates, key=lambda w: (-frequencies.get(w, 0), w))):
+        bound = max_distance if len(heap) < k else -heap[0][0] - 1
+        if bound < 0:
+            break
+        distance = bitparallel_distance(word, candidate, bound)
+        if distance > bound:
+            continue
+        if len(heap) < k:
+            heapq.heappush(heap, (-distance, -rank, candidate))
+        else:
+            heapq.heapreplace(heap, (-distance, -rank, candidate))
+
+    return [w for _, _, w in sorted(heap, reverse=True)] or [word]
 
 if __name__ == '__main__':
-    alle_woerter = read_all_words('/Users/paulwaldecker/Desktop/HTL3R/4CN/SEW/Angaben/06_py_comprehension/de-en.txt')
+    alle_woerter = load_words('/Users/paulwaldecker/Desktop/HTL3R/4CN/SEW/Angaben/06_py_comprehension/de-en.txt')
     ok = correct("Katzis", alle_woerter)
     print(ok)
\ No newline at end of file
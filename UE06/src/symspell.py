@@ -0,0 +1,214 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Set, Tuple
+
+# Nur die ersten PREFIX_LENGTH Buchstaben eines Wortes kommen in den Index (hält den Index klein).
+PREFIX_LENGTH = 7
+
+
+def bitparallel_distance(a: str, b: str, max_distance: int = None) -> int:
+    """
+    Berechnet die Edit-Distanz (Löschen, Einfügen, Ersetzen, zwei benachbarte Buchstaben verdrehen)
+    bit-parallel nach Myers (mit der Erweiterung für Vertauschungen nach Hyyrö):
+    eine Spalte der Matrix ist ein einziger int mit len(a) Bits, pro Buchstabe von b genügen ein paar
+    Bit-Operationen. Mit max_distance wird abgebrochen, sobald die Distanz auch mit den restlichen
+    Buchstaben nicht mehr unter die Schranke kommen kann; dann wird max_distance + 1 geliefert.
+    :param a: erstes Wort
+    :param b: zweites Wort
+    :param max_distance: obere Schranke (None = keine)
+    :return: Edit-Distanz
+    >>> bitparallel_distance('aalsuppe', 'alsupe')
+    2
+    >>> bitparallel_distance('hallo', 'hlalo')
+    1
+    >>> bitparallel_distance('donaudampfschifffahrt', 'dampfer', 3)
+    4
+    >>> bitparallel_distance('dedd', 'cdbbdec', 3)
+    4
+    """
+    m, n = len(a), len(b)
+    if max_distance is not None and abs(m - n) > max_distance:
+        return max_distance + 1
+    if m == 0:
+        return n if max_distance is None or n <= max_distance else max_distance + 1
+
+    # Bitmaske der Positionen jedes Buchstabens in a.
+    peq = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+
+    # vp/vn: vertikale Differenzen +1/-1, d0: Diagonale ohne Änderung.
+    vp, vn, d0, prev_eq = mask, 0, 0, 0
+    score = m
+    for j, c in enumerate(b):
+        eq = peq.get(c, 0)
+        transposition = (((~d0) & eq) << 1) & prev_eq
+        d0 = ((((eq & vp) + vp) ^ vp) | eq | vn | transposition) & mask
+        hp = (vn | ~(d0 | vp)) & mask
+        hn = vp & d0
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        hp = ((hp << 1) | 1) & mask
+        hn = (hn << 1) & mask
+        vp = (hn | ~(d0 | hp)) & mask
+        vn = hp & d0
+        prev_eq = eq
+        # Jeder weitere Buchstabe kann die Distanz höchstens um eins senken.
+        if max_distance is not None and score - (n - j - 1) > max_distance:
+            return max_distance + 1
+
+    if max_distance is not None and score > max_distance:
+        return max_distance + 1
+    return score
+
+
+def deletes(wort: str, max_distance: int = 2) -> Set[str]:
+    """
+    Alle Varianten von wort, die durch Löschen von höchstens max_distance Buchstaben entstehen (inklusive wort).
+    :param wort: Das Eingangswort.
+    :param max_distance: maximale Anzahl gelöschter Buchstaben
+    :return: Menge der Varianten
+    >>> sorted(deletes('abc', 1))
+    ['ab', 'abc', 'ac', 'bc']
+    >>> len(deletes('abcd', 2))
+    11
+    """
+    result = {wort}
+    frontier = {wort}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+class SymSpell:
+    """
+    Wörterbuch mit Lösch-Index (SymSpell): für jedes Wort werden einmalig alle Lösch-Varianten
+    (bis max_distance) seines Präfixes gespeichert. Eine Suche erzeugt nur noch die Lösch-Varianten
+    des gesuchten Wortes, schlägt sie im Index nach und prüft die wenigen Kandidaten mit bitparallel_distance.
+    Verhält sich wie eine Menge von Wörtern und kann daher überall als alle_woerter verwendet werden.
+
+    Der Index ist ein sortiertes array('Q') mit crc32(variante) << 32 | wort_nummer. Er braucht nur 8 Bytes
+    pro Eintrag und lässt sich mit pickle als ein Block speichern und laden. Kollisionen von crc32 liefern
+    höchstens zusätzliche Kandidaten, die von bitparallel_distance aussortiert werden.
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int = 2, prefix_length: int = PREFIX_LENGTH):
+        """
+        Konstruktor
+        :param words: Die Wörter des Wörterbuchs.
+        :param max_distance: größte Edit-Distanz, für die der Index gebaut wird
+        :param prefix_length: Anzahl der Buchstaben pro Wort, die in den Index kommen
+        """
+        self.__words = frozenset(words)
+        self.__max_distance = max_distance
+        self.__prefix_length = prefix_length
+        self.__word_list = sorted(self.__words)
+        self.__index = array('Q', sorted(zlib.crc32(variant.encode()) << 32 | number
+                                         for number, word in enumerate(self.__word_list)
+                                         for variant in deletes(word[:prefix_length], max_distance)))
+
+    @property
+    def words(self) -> frozenset:
+        """
+        Die Wörter des Wörterbuchs.
+        """
+        return self.__words
+
+    @property
+    def max_distance(self) -> int:
+        """
+        Größte Edit-Distanz, für die der Index gebaut wurde.
+        """
+        return self.__max_distance
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.__words
+
+    def __iter__(self):
+        return iter(self.__words)
+
+    def __len__(self) -> int:
+        return len(self.__words)
+
+    def candidates(self, word: str, max_distance: int = None) -> Set[str]:
+        """
+        Liefert die Wörter, die sich mit word eine Lösch-Variante teilen, noch ohne die Distanz zu prüfen.
+        Enthält alle Wörter mit Edit-Distanz höchstens max_distance (und einige weiter entfernte).
+        :param word: Das Eingangswort (in Kleinbuchstaben).
+        :param max_distance: größte Edit-Distanz (None = die des Index, mehr geht nicht)
+        :return: Menge der Kandidaten
+        >>> sorted(SymSpell(['hallo', 'halle', 'lupe']).candidates('haalo'))
+        ['halle', 'hallo']
+        """
+        if max_distance is None or max_distance > self.__max_distance:
+            max_distance = self.__max_distance
+
+        found = set()
+        for variant in deletes(word[:self.__prefix_length], max_distance):
+            key = zlib.crc32(variant.encode())
+            i = bisect_left(self.__index, key << 32)
+            while i < len(self.__index) and self.__index[i] >> 32 == key:
+                found.add(self.__word_list[self.__index[i] & 0xffffffff])
+                i += 1
+        return found
+
+    def lookup(self, word: str, max_distance: int = None) -> List[Tuple[str, int]]:
+        """
+        Findet alle Wörter mit Edit-Distanz höchstens max_distance.
+        :param word: Das Eingangswort.
+        :param max_distance: größte Edit-Distanz (None = die des Index, mehr geht nicht)
+        :return: nach Distanz und Wort sortierte Liste von (wort, distanz)
+        >>> s = SymSpell(['hallo', 'halle', 'aalsuppe', 'lupe'])
+        >>> s.lookup('haalo')
+        [('hallo', 1), ('halle', 2)]
+        >>> s.lookup('haalo', 1)
+        [('hallo', 1)]
+        >>> s.lookup('xyz')
+        []
+        """
+        if max_distance is None or max_distance > self.__max_distance:
+            max_distance = self.__max_distance
+        word = word.lower()
+
+        found = ((candidate, bitparallel_distance(word, candidate, max_distance))
+                 for candidate in self.candidates(word, max_distance))
+        return sorted(((w, d) for w, d in found if d <= max_distance), key=lambda x: (x[1], x[0]))
+
+    def correct(self, word: str) -> Set[str]:
+        """
+        Wie spellcheck.correct: das Wort selbst, sonst alle Wörter mit der kleinsten Edit-Distanz
+        (höchstens max_distance), sonst das ursprüngliche Wort.
+        :param word: Das Eingangswort.
+        :return: Mögliche Korrekturen.
+        >>> s = SymSpell(['hallo', 'halle', 'aalsuppe', 'lupe'])
+        >>> s.correct('Hallo')
+        {'hallo'}
+        >>> s.correct('Haalo')
+        {'hallo'}
+        >>> sorted(s.correct('Alsupe'))
+        ['aalsuppe', 'lupe']
+        >>> s.correct('Quatsch')
+        {'quatsch'}
+        """
+        word = word.lower()
+        if word in self.__words:
+            return {word}
+        hits = self.lookup(word)
+        if not hits:
+            return {word}
+        return {w for w, d in hits if d == hits[0][1]}
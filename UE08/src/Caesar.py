@@ -8,11 +8,27 @@ __status__ = "Finished"
 """
 
 
-import re
+import string
 from collections import Counter
 
+import normalizer
+
+ALPHABET = string.ascii_lowercase
+
+# Relative Buchstabenhäufigkeiten (a..z) in deutschen Texten.
+GERMAN_FREQUENCIES = [0.0651, 0.0189, 0.0306, 0.0508, 0.1740, 0.0166, 0.0301, 0.0476, 0.0755, 0.0027, 0.0121,
+                      0.0344, 0.0253, 0.0978, 0.0251, 0.0079, 0.0002, 0.0700, 0.0727, 0.0615, 0.0435, 0.0067,
+                      0.0189, 0.0003, 0.0004, 0.0113]
+
 class Caesar:
 
+    # Alle 26 Verschiebungstabellen werden einmalig beim Laden der Klasse berechnet.
+    _shift_tables = [str.maketrans(ALPHABET, ALPHABET[i:] + ALPHABET[:i]) for i in range(26)]
+    _byte_tables = [bytes.maketrans(ALPHABET.encode(), (ALPHABET[i:] + ALPHABET[:i]).encode()) for i in range(26)]
+
+    # Blockgröße für das Verschlüsseln an Ort und Stelle (encrypt_bytes mit inplace=True).
+    _block_size = 1 << 20
+
     def __init__(self, key: chr = 'a'):
         """
         Konstruktor
@@ -33,12 +49,12 @@ class Caesar:
 
     def to_lowercase_letter_only(self, plaintext: str) -> str:
         """Wandelt den plaintext in Kleinbuchstaben um und entfernt alle Zeichen, die keine
-        Kleinbuchstaben aus dem Bereich [a..z] sind.
+        Kleinbuchstaben aus dem Bereich [a..z] sind. Verwendet den gemeinsamen normalizer.
         >>> caesar = Caesar()
         >>> caesar.to_lowercase_letter_only("Wandelt den plaintext in Kleinbuchstaben um und entfernt alle Zeichen, die keine Kleinbuchstaben aus dem Bereich [a..z] sind.")
         'wandeltdenplaintextinkleinbuchstabenumundentferntallezeichendiekeinekleinbuchstabenausdembereichazsind'
         """
-        return ''.join([c.lower() for c in plaintext if re.compile('[a-zA-Z]').match(c)])
+        return normalizer.to_lowercase_letter_only(plaintext)
 
     def encrypt(self, plaintext: str, key: str = None) -> str:
         """key ist ein Buchstabe, der definiert, um wieviele Zeichen verschoben wird.
@@ -61,12 +77,7 @@ class Caesar:
         key = key.lower()
         plaintext = self.to_lowercase_letter_only(plaintext)
 
-        for i in range(len(plaintext)):
-            if plaintext[i].isalpha():
-                plaintext = plaintext[:i] + chr((ord(plaintext[i]) + (ord(key) - 97) - 97) % 26 + 97) + plaintext[
-                                                                                                        i + 1:]
-
-        return plaintext
+        return plaintext.translate(Caesar._shift_tables[(ord(key) - ord('a')) % 26])
 
     def decrypt(self, crypttext: str, key=None) -> str:
         """
@@ -91,7 +102,140 @@ class Caesar:
 
         return self.encrypt(crypttext, chr((ord('a') - ord(key)) % 26 + ord('a')))
 
+    def encrypt_bytes(self, data: bytes, key: str = None, inplace: bool = False) -> bytes:
+        """
+        Verschlüsselt einen bereits normalisierten Text (bytes mit a..z) mit einem bytes.translate.
+        Mit inplace=True wird ein bytearray blockweise an Ort und Stelle verschlüsselt, es entsteht
+        also keine zweite Kopie des Textes.
+        >>> Caesar().encrypt_bytes(b"xyz", "c")
+        b'zab'
+        >>> data = bytearray(b"hallo")
+        >>> Caesar().encrypt_bytes(data, "b", inplace=True) is data, data
+        (True, bytearray(b'ibmmp'))
+
+        :param data: normalisierter Text
+        :param key: Schlüssel
+        :param inplace: True, um data (bytearray) selbst zu verändern
+        :return: verschlüsselter Text
+        """
+        if key is None:
+            key = self.__key
+
+        table = Caesar._byte_tables[(ord(key.lower()) - ord('a')) % 26]
+        if not inplace:
+            return data.translate(table)
+
+        for start in range(0, len(data), Caesar._block_size):
+            data[start:start + Caesar._block_size] = data[start:start + Caesar._block_size].translate(table)
+        return data
+
+    def decrypt_bytes(self, data: bytes, key: str = None, inplace: bool = False) -> bytes:
+        """
+        Entschlüsselt einen normalisierten Text (bytes mit a..z), siehe encrypt_bytes.
+        >>> Caesar().decrypt_bytes(b"zab", "c")
+        b'xyz'
+
+        :param data: normalisierter Geheimtext
+        :param key: Schlüssel
+        :param inplace: True, um data (bytearray) selbst zu verändern
+        :return: entschlüsselter Text
+        """
+        if key is None:
+            key = self.__key
+
+        return self.encrypt_bytes(data, chr((ord('a') - ord(key.lower())) % 26 + ord('a')), inplace)
 
+    def letter_counts(self, data: bytes) -> list[int]:
+        """
+        Zählt die Buchstaben a..z in einem normalisierten Text (bytes).
+        >>> Caesar().letter_counts(b"abba")[:3]
+        [2, 2, 0]
+
+        :param data: normalisierter Text als bytes
+        :return: Liste mit 26 Häufigkeiten
+        """
+        return [data.count(c) for c in ALPHABET.encode()]
+
+    def rank_shifts(self, counts: list[int]) -> list[tuple[str, float]]:
+        """
+        Bewertet alle 26 Schlüssel mit dem Chi-Quadrat-Abstand zwischen den beobachteten
+        Häufigkeiten und der deutschen Buchstabenverteilung. Kleinerer Wert = besser.
+        >>> counts = Caesar().letter_counts(Caesar().encrypt("Ein ganz gewoehnlicher deutscher Satz", "k").encode())
+        >>> Caesar().rank_shifts(counts)[0][0]
+        'k'
+
+        :param counts: Häufigkeiten der Buchstaben a..z im Geheimtext
+        :return: nach Chi-Quadrat aufsteigend sortierte Liste von (schluessel, chi2)
+        """
+        return sorted([(key, self.chi_squared(counts, key)) for key in ALPHABET], key=lambda x: x[1])
+
+    def chi_squared(self, counts: list[int], key: str = 'a') -> float:
+        """
+        Chi-Quadrat-Abstand der mit key entschlüsselten Häufigkeiten zur deutschen Buchstabenverteilung.
+        >>> Caesar().chi_squared([0] * 26)
+        0.0
+        >>> round(Caesar().chi_squared(Caesar().letter_counts(b"eeee")), 2)
+        18.99
+
+        :param counts: Häufigkeiten der Buchstaben a..z im Geheimtext
+        :param key: Schlüssel, mit dem entschlüsselt wird
+        :return: Chi-Quadrat-Wert
+        """
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+
+        shift = ord(key.lower()) - ord('a')
+        chi2 = 0.0
+        for c in range(26):
+            expected = total * GERMAN_FREQUENCIES[(c - shift) % 26]
+            chi2 += (counts[c] - expected) ** 2 / expected
+        return chi2
+
+    def crack_sampled(self, blocks, min_margin: float = 500.0, min_letters: int = 1000) -> tuple[str, float, int]:
+        """
+        Knackt einen Caesar-Text blockweise und hört auf, sobald der beste Schlüssel beim
+        Chi-Quadrat-Test um mindestens min_margin vor dem zweitbesten liegt. So muss bei großen
+        Dateien meist nur ein kleiner Teil gelesen werden.
+        >>> text = Caesar().encrypt("Vor einem großen Walde wohnte ein armer Holzhacker mit seiner Frau und seinen zwei Kindern", "y")
+        >>> blocks = [text[i:i + 20].encode() for i in range(0, len(text), 20)]
+        >>> key, chi2, consumed = Caesar().crack_sampled(blocks, min_margin=100, min_letters=0)
+        >>> key, consumed < len(text)
+        ('y', True)
+
+        :param blocks: iterierbare Folge von bytes-Blöcken (z.B. aus einem mmap)
+        :param min_margin: nötiger Chi-Quadrat-Abstand zwischen bestem und zweitbestem Schlüssel
+        :param min_letters: Mindestanzahl an Buchstaben, bevor abgebrochen werden darf
+        :return: (schluessel, chi2, gelesene_bytes)
+        """
+        counts = [0] * 26
+        consumed = 0
+        ranking = self.rank_shifts(counts)
+        for block in blocks:
+            consumed += len(block)
+            for i, count in enumerate(self.letter_counts(normalizer.letters_from_bytes(block))):
+                counts[i] += count
+            ranking = self.rank_shifts(counts)
+            if sum(counts) >= min_letters and ranking[1][1] - ranking[0][1] >= min_margin:
+                break
+
+        return ranking[0][0], ranking[0][1], consumed
+
+    def crack_counts(self, counts: list[int], elements: int = 1) -> list[str]:
+        """
+        Wie crack, arbeitet aber auf den Buchstabenhäufigkeiten (letter_counts), z.B. von einem
+        normalisierten Text aus normalizer.map_letters. Bei gleicher Häufigkeit gewinnt der
+        Buchstabe, der im Alphabet zuerst kommt.
+        >>> c = Caesar()
+        >>> c.crack_counts(c.letter_counts(c.encrypt("Ein ganz gewoehnlicher deutscher Satz", "k").encode()))
+        ['k']
+
+        :param counts: Häufigkeiten der Buchstaben a..z im Geheimtext
+        :param elements: Anzahl der gelieferten Schlüssel
+        :return: wahrscheinlichste Schlüssel
+        """
+        ranking = sorted((i for i in range(26) if counts[i]), key=lambda i: counts[i], reverse=True)
+        return [ALPHABET[(i - 4) % 26] for i in ranking[:max(1, min(elements, 26))]]
 
     def crack(self, crypttext: str, elements: int = 1) -> list[str]:
         """
@@ -0,0 +1,172 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from multiprocessing import util
+
+import normalizer
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'cvcrack.sqlite')
+BLOCK_SIZE = 1 << 20
+
+# So viele Treffer werden gesammelt, bevor last_used in einer einzigen Transaktion aktualisiert wird.
+TOUCH_BATCH = 256
+
+# Nach so vielen Einfügungen wird die Anzahl der Einträge neu gezählt (andere Prozesse fügen auch ein).
+RECOUNT_INTERVAL = 1000
+
+
+def digest_file(path: str, block_size: int = BLOCK_SIZE) -> tuple[str, int]:
+    """
+    SHA-256 des normalisierten Inhalts einer Datei. Die Datei wird blockweise gelesen und direkt
+    als bytes normalisiert, gleiche Geheimtexte mit anderer Formatierung ergeben daher denselben Wert.
+
+    :param path: Pfad zur Datei
+    :param block_size: Blockgröße in Bytes
+    :return: (hexdigest, gelesene_bytes)
+    """
+    sha = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while block := f.read(block_size):
+            size += len(block)
+            sha.update(normalizer.letters_from_bytes(block))
+    return sha.hexdigest(), size
+
+
+def _write_touched(db: sqlite3.Connection, touched: dict, commit: bool = True):
+    """
+    Schreibt gesammelte last_used-Zeitpunkte (dict (digest, mode, version) -> zeitpunkt) und leert das dict.
+    """
+    if touched:
+        db.executemany('UPDATE results SET last_used = ? WHERE digest = ? AND mode = ? AND version = ?',
+                       [(used, *entry) for entry, used in touched.items()])
+        touched.clear()
+        if commit:
+            db.commit()
+
+
+class CrackCache:
+    """
+    Persistenter Zwischenspeicher für Crack-Ergebnisse in einer SQLite-Datenbank.
+    Schlüssel ist der SHA-256 des normalisierten Geheimtextes zusammen mit dem Modus
+    (Chiffre und Optionen) und der Algorithmus-Version. Werden mehr als max_entries Einträge
+    gespeichert, werden die am längsten nicht verwendeten gelöscht.
+
+    Treffer schreiben nicht sofort: last_used wird gesammelt und blockweise (TOUCH_BATCH, bei put,
+    flush, close und beim Beenden des Prozesses) in einer Transaktion aktualisiert. Die Anzahl der
+    Einträge wird mitgezählt statt bei jedem put neu ermittelt.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_entries: int = 100_000):
+        """
+        Konstruktor
+
+        :param path: Pfad zur Datenbank (':memory:' für einen flüchtigen Speicher)
+        :param max_entries: maximale Anzahl an Einträgen
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.__max_entries = max_entries
+        self.__db = sqlite3.connect(path, timeout=30)
+        if path != ':memory:':
+            self.__db.execute('PRAGMA journal_mode=WAL')
+        self.__db.execute('CREATE TABLE IF NOT EXISTS results (digest TEXT, mode TEXT, version TEXT, key TEXT, '
+                          'score REAL, last_used REAL, PRIMARY KEY (digest, mode, version))')
+        self.__db.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        self.__db.commit()
+        self.__touched = {}
+        self.__count = len(self)
+        self.__inserts = 0
+        # Auch in Worker-Prozessen ausführen (dort laufen keine atexit-Handler).
+        self.__finalizer = util.Finalize(self, _write_touched, (self.__db, self.__touched), exitpriority=10)
+
+    def get(self, digest: str, mode: str, version: str) -> tuple[str, float] or None:
+        """
+        Liefert das gespeicherte Ergebnis und markiert es als zuletzt verwendet (siehe flush).
+        >>> cache = CrackCache(':memory:')
+        >>> cache.get('abc', 'caesar', '1') is None
+        True
+        >>> cache.put('abc', 'caesar', '1', 'k', 12.5)
+        >>> cache.get('abc', 'caesar', '1')
+        ('k', 12.5)
+
+        :param digest: SHA-256 des normalisierten Geheimtextes
+        :param mode: Chiffre und Optionen
+        :param version: Algorithmus-Version
+        :return: (schluessel, score) oder None
+        """
+        row = self.__db.execute('SELECT key, score FROM results WHERE digest = ? AND mode = ? AND version = ?',
+                                (digest, mode, version)).fetchone()
+        if row is None:
+            return None
+
+        self.__touched[digest, mode, version] = time.time()
+        if len(self.__touched) >= TOUCH_BATCH:
+            self.flush()
+        return row[0], row[1]
+
+    def flush(self):
+        """
+        Schreibt die gesammelten last_used-Zeitpunkte in einer Transaktion.
+        """
+        _write_touched(self.__db, self.__touched)
+
+    def put(self, digest: str, mode: str, version: str, key: str, score: float):
+        """
+        Speichert ein Ergebnis und entfernt bei Bedarf die am längsten nicht verwendeten Einträge.
+        >>> cache = CrackCache(':memory:', max_entries=2)
+        >>> for i in range(3):
+        ...     cache.put(str(i), 'caesar', '1', 'k', 0.0)
+        >>> len(cache), cache.get('0', 'caesar', '1')
+        (2, None)
+
+        :param digest: SHA-256 des normalisierten Geheimtextes
+        :param mode: Chiffre und Optionen
+        :param version: Algorithmus-Version
+        :param key: gefundener Schlüssel
+        :param score: Score des Schlüssels
+        """
+        self.__touched.pop((digest, mode, version), None)
+        _write_touched(self.__db, self.__touched, commit=False)
+        updated = self.__db.execute('UPDATE results SET key = ?, score = ?, last_used = ? '
+                                    'WHERE digest = ? AND mode = ? AND version = ?',
+                                    (key, score, time.time(), digest, mode, version)).rowcount
+        if not updated:
+            self.__db.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                              (digest, mode, version, key, score, time.time()))
+            self.__count += 1
+            self.__inserts += 1
+
+        if self.__inserts >= RECOUNT_INTERVAL or self.__count > self.__max_entries:
+            self.__count = len(self)
+            self.__inserts = 0
+        excess = self.__count - self.__max_entries
+        if excess > 0:
+            self.__db.execute('DELETE FROM results WHERE rowid IN '
+                              '(SELECT rowid FROM results ORDER BY last_used, rowid LIMIT ?)', (excess,))
+            self.__count -= excess
+        self.__db.commit()
+
+    def __len__(self) -> int:
+        """
+        Anzahl der gespeicherten Einträge.
+        """
+        return self.__db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        """
+        Schreibt die gesammelten Treffer und schließt die Datenbank.
+        """
+        self.flush()
+        self.__finalizer.cancel()
+        self.__db.close()
@@ -0,0 +1,189 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import normalizer
+from Caesar import Caesar, ALPHABET
+
+LETTERS = [c.encode() for c in ALPHABET]
+
+
+class IncrementalKasiski:
+    """
+    Kasiski-Analyse für Geheimtexte, die stückweise eintreffen.
+    Mit :meth:`feed` werden neue Blöcke verarbeitet, ohne frühere Daten erneut zu lesen.
+    Aktualisiert werden die n-Gramm-Positionen und die Buchstabenzählungen pro Spalte für
+    alle Schlüssellängen 1..max_len, aus denen Koinzidenzindex, Schlüssellänge und Schlüssel
+    jederzeit berechnet werden können.
+    """
+
+    def __init__(self, max_len: int = 20, ngram: int = 3, stable_after: int = 3, min_letters: int = 200):
+        """
+        Konstruktor
+
+        :param max_len: größte betrachtete Schlüssellänge
+        :param ngram: Länge der indizierten Teilstrings
+        :param stable_after: Anzahl aufeinanderfolgender feed-Aufrufe mit gleicher Schätzung, ab der sie als stabil gilt
+        :param min_letters: Mindestanzahl an Buchstaben, bevor eine Schätzung als stabil gelten kann
+        """
+        self.__max_len = max_len
+        self.__ngram = ngram
+        self.__stable_after = stable_after
+        self.__min_letters = min_letters
+
+        self.__length = 0
+        self.__tail = b''
+        self.__positions = {}
+        # counts[laenge][spalte][buchstabe]
+        self.__counts = {laenge: [[0] * 26 for _ in range(laenge)] for laenge in range(1, max_len + 1)}
+        self.__last_estimate = None
+        self.__unchanged = 0
+
+    @property
+    def length(self) -> int:
+        """
+        Anzahl der bisher verarbeiteten Buchstaben.
+        """
+        return self.__length
+
+    @property
+    def stable(self) -> bool:
+        """
+        True, sobald sich die geschätzte Schlüssellänge über stable_after Blöcke nicht mehr geändert hat.
+        """
+        return self.__length >= self.__min_letters and self.__unchanged >= self.__stable_after
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Verarbeitet einen weiteren Block des Geheimtextes.
+        Usage examples:
+        >>> k = IncrementalKasiski(max_len=6, stable_after=1, min_letters=0)
+        >>> k.feed("abcab")
+        False
+        >>> k.feed("cabcab")
+        False
+        >>> k.feed("cab")
+        True
+        >>> k.length
+        14
+        >>> k.ngram_positions()["abc"]
+        [0, 3, 6, 9]
+
+        :param chunk: Block des Geheimtextes (wird normalisiert)
+        :return: True, wenn die Schätzung der Schlüssellänge stabil ist
+        """
+        data = normalizer.letters_only(chunk)
+        if not data:
+            return self.stable
+
+        self.__index_ngrams(data)
+        self.__count_columns(data)
+        self.__length += len(data)
+
+        estimate = self.current_key_length_estimate()
+        if estimate == self.__last_estimate:
+            self.__unchanged += 1
+        else:
+            self.__last_estimate = estimate
+            self.__unchanged = 0
+        return self.stable
+
+    def __index_ngrams(self, data: bytes):
+        """
+        Ergänzt den n-Gramm-Index. Die letzten ngram-1 Buchstaben des vorigen Blocks werden
+        mitgenommen, damit auch n-Gramme über Blockgrenzen gefunden werden.
+        """
+        n = self.__ngram
+        buffer = self.__tail + data
+        base = self.__length - len(self.__tail)
+        for i in range(len(buffer) - n + 1):
+            self.__positions.setdefault(buffer[i:i + n].decode('ascii'), []).append(base + i)
+        self.__tail = buffer[-(n - 1):] if n > 1 else b''
+
+    def __count_columns(self, data: bytes):
+        """
+        Zählt die Buchstaben des Blocks für jede Schlüssellänge spaltenweise (bytes.count auf Slices).
+        """
+        for laenge, columns in self.__counts.items():
+            for column in range(laenge):
+                part = data[(column - self.__length) % laenge::laenge]
+                if part:
+                    counts = columns[column]
+                    for i, letter in enumerate(LETTERS):
+                        counts[i] += part.count(letter)
+
+    def ngram_positions(self) -> dict[str, list[int]]:
+        """
+        Liefert den bisherigen n-Gramm-Index (teilstring -> Positionen).
+        """
+        return self.__positions
+
+    def distances(self) -> list[int]:
+        """
+        Aufsteigend sortierte Abstände aller bisher gefundenen Wiederholungen (wie Kasiski.dist_n_list).
+        Usage examples:
+        >>> k = IncrementalKasiski()
+        >>> _ = k.feed("heissajuc")
+        >>> _ = k.feed("heieinei")
+        >>> k.distances()
+        [9]
+        """
+        n = self.__ngram
+        return sorted({b - a for positions in self.__positions.values() if len(positions) > 1
+                       for i, a in enumerate(positions) for b in positions[i + 1:] if b - a >= n})
+
+    def ioc_key_lengths(self) -> list[tuple[int, float]]:
+        """
+        Wie Kasiski.ioc_key_lengths, aber aus den mitgeführten Zählungen berechnet.
+        Usage examples:
+        >>> k = IncrementalKasiski(max_len=4)
+        >>> _ = k.feed("abcabc")
+        >>> _ = k.feed("abcabc")
+        >>> [(laenge, round(score, 3)) for laenge, score in k.ioc_key_lengths()]
+        [(3, 1.0), (1, 0.273), (2, 0.2), (4, 0.0)]
+        """
+        scores = []
+        for laenge in range(1, min(self.__max_len, self.__length // 2) + 1):
+            total = 0.0
+            for counts in self.__counts[laenge]:
+                n = sum(counts)
+                total += sum(c * (c - 1) for c in counts) / (n * (n - 1))
+            scores.append((laenge, total / laenge))
+        return sorted(scores, key=lambda x: x[1], reverse=True)
+
+    def current_key_length_estimate(self, tolerance: float = 0.9) -> int:
+        """
+        Aktuelle Schätzung der Schlüssellänge (kleinste Länge innerhalb tolerance des besten Scores).
+        """
+        ranking = self.ioc_key_lengths()
+        if not ranking:
+            return 1
+
+        best = ranking[0][1]
+        return min(laenge for laenge, score in ranking if score >= tolerance * best)
+
+    def current_key(self, laenge: int = None) -> str:
+        """
+        Aktuell wahrscheinlichster Schlüssel, per Chi-Quadrat aus den Spaltenzählungen bestimmt.
+        Usage examples:
+        >>> from Vigenere import Vigenere
+        >>> text = Vigenere().encrypt("Die geheime Botschaft muss sofort an den Empfänger weitergegeben werden. " * 4, "abc")
+        >>> k = IncrementalKasiski(max_len=6)
+        >>> for i in range(0, len(text), 50):
+        ...     _ = k.feed(text[i:i + 50])
+        >>> k.current_key_length_estimate(), k.current_key()
+        (3, 'abc')
+
+        :param laenge: Schlüssellänge (None = aktuelle Schätzung)
+        :return: Schlüssel
+        """
+        if laenge is None:
+            laenge = self.current_key_length_estimate()
+
+        c = Caesar()
+        return ''.join(c.rank_shifts(counts)[0][0] for counts in self.__counts[laenge])
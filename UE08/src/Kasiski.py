@@ -7,9 +7,13 @@ __license__ = "GPL"
 __status__ = "Finished"
 """
 from builtins import str
+import heapq
+from operator import add
 from collections import Counter
-from Caesar import Caesar
+from Caesar import Caesar, ALPHABET
 from Vigenere import Vigenere
+import normalizer
+from Quadgram import TO_NUMBERS
 
 
 class Kasiski:
@@ -37,36 +41,108 @@ class Kasiski:
 
     def allpos(self, text: str, teilstring: str) -> list[int]:
         """
-        Berechnet die Positionen von teilstring in text.
+        Berechnet die Positionen von teilstring in text (auch überlappende Vorkommen).
+        Die Suche erfolgt mit str.find ab dem jeweils nächsten Index.
         Usage examples:
         >>> k = Kasiski()
         >>> k.allpos("heissajuchei, ein ei", "ei")
         [1, 10, 14, 18]
         >>> k.allpos("heissajuchei, ein ei", "hai")
         []
+        >>> k.allpos("aaaa", "aa")
+        [0, 1, 2]
         """
-        return [i for i in range(len(text)) if text[i:i + len(teilstring)] == teilstring]
+        if not teilstring:
+            return list(range(len(text)))
 
-    def alldist(self, text: str, teilstring: str) -> set[int]:
+        positions = []
+        i = text.find(teilstring)
+        while i != -1:
+            positions.append(i)
+            i = text.find(teilstring, i + 1)
+        return positions
+
+    def alldist(self, text: str, teilstring: str, mode: str = 'all') -> set[int]:
         """
         Berechnet die Abstände zwischen den Wiederholungen des Teilstrings im verschlüsselten Text.
+        Die Positionen werden nur einmal bestimmt. Mit mode='all' werden die Abstände aller Paare
+        geliefert, mit mode='consecutive' nur die Abstände aufeinanderfolgender Vorkommen.
         Usage examples:
         >>> k = Kasiski()
         >>> k.alldist("heissajuchei, ein ei", "ei")
         {4, 8, 9, 13, 17}
+        >>> k.alldist("heissajuchei, ein ei", "ei", 'consecutive')
+        {9, 4}
         >>> k.alldist("heissajuchei, ein ei", "hai")
         {}
+        >>> k.alldist("heissajuchei, ein ei", "ei", 'some')
+        Traceback (most recent call last):
+        ...
+        ValueError: mode must be 'all' or 'consecutive'.
         """
-        dist = {j - i for i in self.allpos(text, teilstring) for j in self.allpos(text, teilstring) if i < j}
+        positions = self.allpos(text, teilstring)
+        if mode == 'all':
+            dist = {positions[j] - positions[i] for i in range(len(positions)) for j in range(i + 1, len(positions))}
+        elif mode == 'consecutive':
+            dist = {b - a for a, b in zip(positions, positions[1:])}
+        else:
+            raise ValueError("mode must be 'all' or 'consecutive'.")
         if dist == set():
             return {}
 
         return dist
 
-    def dist_n_tuple(self, text: str, laenge: int) -> set[tuple[str, int]]:
+    def ngram_index(self, text: str, laenge: int) -> dict[str, list[int]]:
+        """
+        Ordnet jedem Teilstring der gegebenen laenge die aufsteigende Liste seiner Positionen zu.
+        Der Text wird dabei nur einmal durchlaufen.
+        Usage examples:
+        >>> k = Kasiski()
+        >>> k.ngram_index("heissajuchei", 2)["ei"]
+        [1, 10]
+        >>> k.ngram_index("abab", 2)
+        {'ab': [0, 2], 'ba': [1]}
+        """
+        index = {}
+        for i in range(len(text) - laenge + 1):
+            index.setdefault(text[i:i + laenge], []).append(i)
+        return index
+
+    def repeat_distances(self, text: str, laenge: int, max_dist: int = None):
+        """
+        Liefert (teilstring, abstand) für alle Wiederholungen von Teilstrings der gegebenen laenge.
+        Es werden nur Positionen aus dem n-Gramm-Index verglichen, also nur echte Wiederholungen.
+        Wie bei dist_n_tuple müssen sich die beiden Vorkommen nicht überlappen (abstand >= laenge).
+        Mit max_dist werden pro Teilstring höchstens so viele Abstände geliefert; dabei kommen zuerst
+        die Abstände benachbarter Vorkommen, dann die übernächsten usw.
+        Usage examples:
+        >>> k = Kasiski()
+        >>> sorted(k.repeat_distances("heissajucheieinei", 2))
+        [('ei', 2), ('ei', 3), ('ei', 5), ('ei', 9), ('ei', 11), ('ei', 14), ('he', 9)]
+        >>> sorted(k.repeat_distances("heissajucheieinei", 2, 2))
+        [('ei', 2), ('ei', 9), ('he', 9)]
+        """
+        for ngram, positions in self.ngram_index(text, laenge).items():
+            if len(positions) < 2:
+                continue
+            count = 0
+            for gap in range(1, len(positions)):
+                for k in range(len(positions) - gap):
+                    dist = positions[k + gap] - positions[k]
+                    if dist < laenge:
+                        continue
+                    yield ngram, dist
+                    count += 1
+                    if max_dist is not None and count >= max_dist:
+                        break
+                if max_dist is not None and count >= max_dist:
+                    break
+
+    def dist_n_tuple(self, text: str, laenge: int, max_dist: int = None) -> set[tuple[str, int]]:
         """
         Überprüft alle Teilstrings aus text mit der gegebenen laenge und liefert ein Set
         mit den Abständen aller Wiederholungen der Teilstrings in text.
+        Verwendet den n-Gramm-Index (siehe repeat_distances); max_dist begrenzt die Abstände pro Teilstring.
         Usage examples:
         >>> k = Kasiski()
         >>> k.dist_n_tuple("heissajuchei", 2) == {('ei', 9), ('he', 9)}
@@ -79,10 +155,9 @@ class Kasiski:
         {('ei', 5), ('ei', 14), ('ei', 3), ('ei', 9), ('ei', 11), ('he', 9), ('ei', 2)}
         True
         """
-        return {(text[i:i + laenge], j - i) for i in range(len(text) - laenge + 1) for j in range(i + laenge, len(text))
-                if text[i:i + laenge] == text[j:j + laenge]}
+        return set(self.repeat_distances(text, laenge, max_dist))
 
-    def dist_n_list(self, text: str, laenge: int) -> list[int]:
+    def dist_n_list(self, text: str, laenge: int, max_dist: int = None) -> list[int]:
         """
         Wie dist_tuple, liefert aber nur eine aufsteigend sortierte Liste der
         Abstände ohne den Text zurück. In der Liste soll kein Element mehrfach vorkommen.
@@ -95,8 +170,7 @@ class Kasiski:
         >>> k.dist_n_list("heissajucheieinei", 4) == []
         True
         """
-        return sorted(set([j - i for i in range(len(text) - laenge + 1) for j in range(i + laenge, len(text)) if
-                           text[i:i + laenge] == text[j:j + laenge]]))
+        return sorted({dist for _, dist in self.repeat_distances(text, laenge, max_dist)})
 
     def ggt(self, x: int, y: int) -> int:
         """
@@ -112,22 +186,174 @@ class Kasiski:
             x, y = y, x % y
         return x
 
-    def ggt_count(self, zahlen: list[int]) -> Counter:
+    def ggt_count(self, zahlen: list[int], mode: str = 'ggt', max_len: int = 20) -> Counter:
         """
         Bestimmt die Häufigkeit der paarweisen ggt aller Zahlen aus list.
+        Mit mode='divisor' wird stattdessen das Teiler-Histogramm (siehe divisor_count) geliefert.
         Usage examples:
         >>> k = Kasiski()
         >>> k.ggt_count([12, 14, 16])
         Counter({2: 2, 12: 1, 4: 1, 14: 1, 16: 1})
         >>> k.ggt_count([10, 25, 50, 100])
         Counter({10: 3, 25: 3, 50: 2, 5: 1, 100: 1})
+        >>> k.ggt_count([12, 14, 16], 'divisor', 4)
+        Counter({2: 3, 4: 2, 3: 1})
         """
+        if mode == 'divisor':
+            return self.divisor_count(zahlen, max_len)
+        elif mode != 'ggt':
+            raise ValueError("mode must be 'ggt' or 'divisor'.")
+
         c = Counter()
         for i in range(len(zahlen)):
             for j in range(i, len(zahlen)):
                 c[self.ggt(zahlen[i], zahlen[j])] += 1
         return c
 
+    def divisor_count(self, zahlen: list[int], max_len: int = 20) -> Counter:
+        """
+        Zählt für jede mögliche Schlüssellänge 2..max_len, wie viele der Zahlen sie teilt.
+        Gleiche Abstände werden vorher zusammengefasst, der Aufwand ist also O(m * max_len)
+        statt O(m²) wie bei ggt_count.
+        Usage examples:
+        >>> k = Kasiski()
+        >>> k.divisor_count([12, 14, 16], 4)
+        Counter({2: 3, 4: 2, 3: 1})
+        >>> k.divisor_count([14, 21, 35, 70], 10).most_common(1)
+        [(7, 4)]
+        """
+        distances = Counter(zahlen)
+        c = Counter()
+        for laenge in range(2, max_len + 1):
+            count = sum(anzahl for zahl, anzahl in distances.items() if zahl % laenge == 0)
+            if count:
+                c[laenge] = count
+        return c
+
+    def divisor_key_length(self, zahlen: list[int], max_len: int = 20) -> int:
+        """
+        Schätzt die Schlüssellänge aus dem Teiler-Histogramm (divisor_count). Jeder Teiler der
+        Schlüssellänge teilt mindestens so viele Abstände wie die Schlüssellänge selbst, daher wird
+        die Anzahl mit dem Zufall verglichen: von m beliebigen Abständen ist etwa m / laenge durch
+        laenge teilbar. Gewählt wird die Länge mit dem größten Überschuss (bei Gleichstand die größere).
+        Liefert 0, wenn keine Länge häufiger als zufällig vorkommt.
+        Usage examples:
+        >>> k = Kasiski()
+        >>> k.divisor_key_length([12, 18, 24, 30, 42, 48, 60, 66])
+        6
+        >>> k.divisor_key_length([14, 21, 35, 70], 10)
+        7
+        >>> k.divisor_key_length([])
+        0
+        """
+        m = len(zahlen)
+        scores = {laenge: count - m / laenge for laenge, count in self.divisor_count(zahlen, max_len).items()}
+        laenge, score = max(scores.items(), key=lambda x: (x[1], x[0]), default=(0, 0))
+        return laenge if score > 0 else 0
+
+    def ioc_key_lengths(self, text: str, max_len: int = 20) -> list[tuple[int, float]]:
+        """
+        Bewertet alle Schlüssellängen 1..max_len mit dem durchschnittlichen Koinzidenzindex
+        der Spalten. Für jede Länge wird die Buchstaben-Zählmatrix (Spalte x Buchstabe) mit
+        bytes.count erstellt, es werden also keine Abstände paarweise verglichen.
+        Liefert eine nach Score absteigend sortierte Liste von (laenge, score).
+        Usage examples:
+        >>> k = Kasiski()
+        >>> [(laenge, round(score, 3)) for laenge, score in k.ioc_key_lengths("abcabcabcabc", 4)]
+        [(3, 1.0), (1, 0.273), (2, 0.2), (4, 0.0)]
+        """
+        data = normalizer.to_letter_bytes(text)
+        letters = [bytes([c]) for c in range(ord('a'), ord('z') + 1)]
+
+        scores = []
+        for laenge in range(1, min(max_len, len(data) // 2) + 1):
+            total = 0.0
+            for i in range(laenge):
+                column = data[i::laenge]
+                n = len(column)
+                total += sum(c * (c - 1) for c in (column.count(l) for l in letters)) / (n * (n - 1))
+            scores.append((laenge, total / laenge))
+
+        return sorted(scores, key=lambda x: x[1], reverse=True)
+
+    def estimate_key_length(self, text: str, max_len: int = 20, tolerance: float = 0.9) -> int:
+        """
+        Schätzt die Schlüssellänge mit ioc_key_lengths. Da auch Vielfache der Schlüssellänge
+        einen hohen Koinzidenzindex haben, wird die kleinste Länge gewählt, deren Score
+        mindestens tolerance * bester Score ist.
+        Usage examples:
+        >>> k = Kasiski()
+        >>> k.estimate_key_length("abcabcabcabcabcabc", 9)
+        3
+        """
+        ranking = self.ioc_key_lengths(text, max_len)
+        if not ranking:
+            return 1
+
+        best = ranking[0][1]
+        return min(laenge for laenge, score in ranking if score >= tolerance * best)
+
+    def coincidence_profile(self, text: str, max_shift: int = 40) -> list[int]:
+        """
+        Zählt für jede Verschiebung 1..max_shift, an wie vielen Stellen der Text mit seiner
+        verschobenen Kopie übereinstimmt. Der Text wird dazu einmal als große Zahl gelesen;
+        pro Verschiebung genügen ein XOR und das Zählen der Nullbytes (alles in C, O(n) je Verschiebung).
+        Die Spitzen liegen bei der Schlüssellänge und ihren Vielfachen.
+        Index 0 der Liste entspricht Verschiebung 1.
+        Usage examples:
+        >>> k = Kasiski()
+        >>> k.coincidence_profile("abcabcabc", 4)
+        [0, 0, 6, 0]
+        """
+        data = normalizer.to_letter_bytes(text)
+        n = len(data)
+        number = int.from_bytes(data, 'big')
+
+        profile = []
+        for shift in range(1, min(max_shift, n - 1) + 1):
+            rest = n - shift
+            xor = (number >> (8 * shift)) ^ (number & ((1 << (8 * rest)) - 1))
+            profile.append(xor.to_bytes(rest, 'big').count(0))
+        return profile
+
+    def autocorrelation_key_length(self, text: str, max_shift: int = 40, tolerance: float = 0.5) -> int:
+        """
+        Schätzt die Schlüssellänge aus coincidence_profile. Jede Länge wird mit der mittleren
+        Übereinstimmungsrate ihrer Vielfachen bewertet; gewählt wird die kleinste Länge, deren
+        Abstand zum Median aller Raten mindestens tolerance * den besten Abstand erreicht.
+        Bei der halben Schlüssellänge ist nur jedes zweite Vielfache eine Spitze, ihr Score liegt daher
+        ebenfalls bei etwa der Hälfte. Eine Länge wird deshalb nur genommen, wenn auch ihre ungeraden
+        Vielfachen mindestens tolerance * so weit über dem Median liegen wie die geraden.
+        Usage examples:
+        >>> k = Kasiski()
+        >>> text = "Vor einem großen Walde wohnte ein armer Holzhacker mit seiner Frau und seinen zwei Kindern; das Bübchen hieß Hänsel und das Mädchen Gretel. Er hatte wenig zu beißen und zu brechen, und einmal, als große Teuerung ins Land kam, konnte er das tägliche Brot nicht mehr schaffen."
+        >>> k.autocorrelation_key_length(Vigenere().encrypt(text, "gustavo"), 20)
+        7
+        >>> import random
+        >>> from Caesar import GERMAN_FREQUENCIES
+        >>> text = ''.join(random.Random(1).choices(ALPHABET, GERMAN_FREQUENCIES, k=16000))
+        >>> k.autocorrelation_key_length(Vigenere().encrypt(text, "abcdefgh"))
+        8
+        """
+        n = len(normalizer.to_letter_bytes(text))
+        profile = self.coincidence_profile(text, max_shift)
+        if not profile:
+            return 1
+
+        rates = [count / (n - shift) for shift, count in enumerate(profile, start=1)]
+        background = sorted(rates)[len(rates) // 2]
+        scores = {laenge: sum(rates[laenge - 1::laenge]) / len(rates[laenge - 1::laenge]) - background
+                  for laenge in range(1, len(rates) + 1)}
+        best = max(scores.values())
+
+        def excess(values):
+            return sum(values) / len(values) - background if values else 0.0
+
+        return min((laenge for laenge, score in scores.items()
+                    if score >= tolerance * best
+                    and excess(rates[laenge - 1::2 * laenge]) >= tolerance * excess(rates[2 * laenge - 1::2 * laenge])),
+                   default=max(scores, key=scores.get))
+
     def get_nth_letter(self, s: str, start: int, n: int) -> str:
         """
         Extrahiert aus s jeden n. Buchstaben beginnend mit index start.
@@ -141,20 +367,145 @@ class Kasiski:
     def crack_key(self, len: int):
         """
         Diese Methode liefert den Wahrscheinlichsten schlüssel zurück.
+        Der Text wird einmal normalisiert, danach wird für jede Spalte die Häufigkeitsverteilung
+        gezählt (26 x len Matrix) und jeder Schlüsselbuchstabe per Chi-Quadrat gegen die deutsche
+        Buchstabenverteilung gewählt.
         Usage examples:
         >>> k = Kasiski("eeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee")
         >>> k.crack_key(5)
         'aaaaa'
         """
         c = Caesar()
-        crypttxt = c.to_lowercase_letter_only(self.crypttext)
+        crypttxt = normalizer.to_letter_bytes(self.__crypttext)
+
+        counts = [c.letter_counts(self.get_nth_letter(crypttxt, i, len)) for i in range(len)]
+
+        return ''.join([c.rank_shifts(counts[i])[0][0] for i in range(len)])
+
+    def key_score(self, key: str) -> float:
+        """
+        Bewertet einen Schlüssel mit dem durchschnittlichen Chi-Quadrat-Wert der entschlüsselten
+        Spalten (kleiner = besser).
+        Usage examples:
+        >>> k = Kasiski("eeeeeeeeee")
+        >>> k.key_score("a") < k.key_score("b")
+        True
+        """
+        c = Caesar()
+        crypttxt = normalizer.to_letter_bytes(self.__crypttext)
+        key = normalizer.to_lowercase_letter_only(key)
+
+        return sum(c.chi_squared(c.letter_counts(self.get_nth_letter(crypttxt, i, len(key))), key[i])
+                   for i in range(len(key))) / len(key)
+
+    def dictionary_keys(self, words, laenge: int, top: int = 10, prefix: int = 5000) -> list[tuple[str, float]]:
+        """
+        Probiert alle Wörter der gegebenen Länge als Schlüssel. Für die ersten prefix Buchstaben wird
+        einmal eine Tabelle Spalte x Verschiebung mit den Chi-Quadrat-Werten berechnet; der Score
+        eines Wortes ist dann nur noch die Summe von laenge Tabelleneinträgen.
+        Liefert die top besten Schlüssel mit Score (kleiner = besser).
+        Usage examples:
+        >>> text = "Vor einem großen Walde wohnte ein armer Holzhacker mit seiner Frau und seinen zwei Kindern; das Bübchen hieß Hänsel und das Mädchen Gretel."
+        >>> k = Kasiski(Vigenere().encrypt(text, "gustavo"))
+        >>> [key for key, _ in k.dictionary_keys(["gustavo", "schloss", "Gus-tavo", "kasiski", "abc"], 7, 2)]
+        ['gustavo', 'kasiski']
+
+        :param words: Wörter (werden normalisiert, Duplikate zählen einmal)
+        :param laenge: Schlüssellänge
+        :param top: Anzahl der gelieferten Schlüssel
+        :param prefix: Anzahl der Buchstaben, die zur Bewertung herangezogen werden
+        :return: nach Score aufsteigend sortierte Liste von (schluessel, score)
+        """
+        c = Caesar()
+        crypttxt = normalizer.to_letter_bytes(self.__crypttext)[:prefix]
+        table = [[c.chi_squared(c.letter_counts(self.get_nth_letter(crypttxt, j, laenge)), key) for key in ALPHABET]
+                 for j in range(laenge)]
+
+        candidates = {normalizer.letters_only(word) for word in words}
+        scored = ((sum(table[j][letter - 97] for j, letter in enumerate(word)), word) for word in candidates
+                  if len(word) == laenge)
+        return [(word.decode('ascii'), score) for score, word in heapq.nsmallest(top, scored)]
+
+    def refine_key(self, key: str, model, max_rounds: int = 20, sample: int = 10000) -> str:
+        """
+        Verbessert einen Schlüssel (z.B. von crack_key) per Hill-Climbing auf der Quadgramm-
+        Log-Likelihood der ersten sample Buchstaben des Klartextes. Wird ein Schlüsselbuchstabe
+        geändert, werden nur die Quadgramme neu bewertet, die einen Buchstaben dieser Spalte enthalten;
+        ihre Startpositionen sind arithmetische Folgen und werden nicht gespeichert. Der Anteil der
+        übrigen drei Buchstaben am Tabellenindex wird einmal pro Spalte berechnet, pro Kandidat bleibt
+        dann nur noch eine Addition und ein Tabellenzugriff je Quadgramm (mit map, also in C).
+        Usage examples:
+        >>> from Quadgram import Quadgram
+        >>> text = "Vor einem großen Walde wohnte ein armer Holzhacker mit seiner Frau und seinen zwei Kindern; das Bübchen hieß Hänsel und das Mädchen Gretel."
+        >>> model = Quadgram.from_text(text * 3)
+        >>> Kasiski(Vigenere().encrypt(text, "gustavo")).refine_key("gusxaxo", model)
+        'gustavo'
+        >>> Kasiski(Vigenere().encrypt(text, "abc")).refine_key("xbc", model)
+        'abc'
+
+        :param key: Startschlüssel
+        :param model: Quadgram-Modell
+        :param max_rounds: maximale Anzahl an Durchläufen über alle Schlüsselbuchstaben
+        :param sample: Anzahl der Buchstaben, die bewertet werden
+        :return: verbesserter Schlüssel
+        """
+        cipher = normalizer.to_letter_bytes(self.__crypttext)[:sample].translate(TO_NUMBERS)
+        n = len(cipher)
+        laenge = len(key)
+        if n < 4 or laenge == 0:
+            return key
+
+        table = model.table
+        lookup = table.__getitem__
+        subtract = [bytes((x - s) % 26 for x in range(256)) for s in range(26)]
+        shifts = [ord(c) - ord('a') for c in normalizer.to_lowercase_letter_only(key)]
+        columns = [cipher[j::laenge] for j in range(laenge)]
+        weights = [[letter * 26 ** (3 - d) for letter in range(26)] for d in range(4)]
+
+        plain = bytearray(n)
+        for j in range(laenge):
+            plain[j::laenge] = columns[j].translate(subtract[shifts[j]])
 
-        partstr = [self.get_nth_letter(crypttxt, i, len) for i in range(len)]
+        def index(i):
+            return plain[i] * 17576 + plain[i + 1] * 676 + plain[i + 2] * 26 + plain[i + 3]
 
-        return ''.join([c.crack(partstr[i], 1)[0] for i in range(len)])
+        for _ in range(max_rounds):
+            improved = False
+            for j in range(laenge):
+                if laenge < 4:
+                    # Ein Quadgramm enthält die Spalte mehrfach: alle Quadgramme neu bewerten.
+                    def score(shift):
+                        plain[j::laenge] = columns[j].translate(subtract[shift])
+                        return sum(map(lookup, map(index, range(n - 3))))
+                else:
+                    # Quadgramme mit dem Buchstaben der Spalte j an Stelle d beginnen bei j - d + k * laenge.
+                    parts = []
+                    for d in range(4):
+                        starts = range((j - d) % laenge, n - 3, laenge)
+                        first = (starts.start + d - j) // laenge
+                        rest = [index(i) - weights[d][plain[i + d]] for i in starts]
+                        parts.append((rest, weights[d], first, first + len(rest)))
 
+                    def score(shift):
+                        column = columns[j].translate(subtract[shift])
+                        return sum(sum(map(lookup, map(add, rest, map(weight.__getitem__, column[first:last]))))
+                                   for rest, weight, first, last in parts)
 
+                old = score(shifts[j])
+                best_shift, best_gain = shifts[j], 0.0
+                for shift in range(26):
+                    if shift != shifts[j]:
+                        gain = score(shift) - old
+                        if gain > best_gain:
+                            best_shift, best_gain = shift, gain
+                if best_shift != shifts[j]:
+                    shifts[j] = best_shift
+                    improved = True
+                plain[j::laenge] = columns[j].translate(subtract[shifts[j]])
+            if not improved:
+                break
 
+        return ''.join(chr(s + ord('a')) for s in shifts)
 
 if __name__ == "__main__":
     #Attacke auf Vigenere
@@ -162,7 +513,7 @@ if __name__ == "__main__":
     str = "Die geheime Botschaft, die ich Ihnen übermitteln muss, ist von äußerster Wichtigkeit und erfordert höchste Diskretion. Bitte nehmen Sie sich einen Moment Zeit, um diese Nachricht sorgfältig zu lesen und die Anweisungen genau zu befolgen. Unsere Zusammenarbeit und der Erfolg unserer Mission hängen davon ab. Zuerst möchte ich Sie darüber informieren, dass wir dringend ein Treffen benötigen. Dieses Treffen soll um Mitternacht stattfinden, an einem Ort, den wir im Voraus festgelegt haben. Die genauen Koordinaten werden Ihnen zu gegebener Zeit mitgeteilt. Es ist von größter Bedeutung, dass Sie pünktlich und unerkannt erscheinen.Zudem ist es unerlässlich, dass Sie den Schlüssel mitbringen. Dieser Schlüssel ist nicht nur physischer Natur, sondern symbolisiert auch die Verbindung zwischen unseren Bemühungen und dem Erfolg unserer Operation. Bewahren Sie ihn sicher auf und teilen Sie ihn mit niemandem. Bitte seien Sie äußerst wachsam und achten Sie auf verdächtige Aktivitäten. Unsere Feinde sind überall und wir müssen sicherstellen, dass wir nicht von ihnen belauscht oder entdeckt werden. Jegliche Unregelmäßigkeiten müssen sofort gemeldet werden.Das vereinbarte Zeichen wird Ihnen helfen, uns zu identifizieren. Bitte beachten Sie es sorgfältig und verwenden Sie es, um sich zu vergewissern, dass Sie mit der richtigen Person sprechen.Ich vertraue darauf, dass Sie diese Anweisungen verstehen und umsetzen können. Unsere gemeinsamen Ziele erfordern Zusammenarbeit und Engagement. Möge der Erfolg auf unserer Seite sein. Bis bald, und bleiben Sie wachsam."
     x = v.encrypt(str, "gustavo")
     k = Kasiski(x)
-    len = k.ggt_count([k.dist_n_list(x, i) for i in range(3,10)][0]).most_common(1)[0][0]
+    len = k.estimate_key_length(x)
     key = k.crack_key(len)
     print(x)
 
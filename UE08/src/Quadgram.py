@@ -0,0 +1,127 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import math
+import os
+from array import array
+
+import normalizer
+
+SIZE = 26 ** 4
+# Muss erhöht werden, sobald sich die Berechnung der Tabelle ändert (Teil des Namens der gespeicherten Datei).
+MODEL_VERSION = 2
+# Um die Buchstaben a..z auf 0..25 abzubilden (bytes.translate).
+TO_NUMBERS = bytes.maketrans(bytes(range(ord('a'), ord('z') + 1)), bytes(range(26)))
+
+
+class Quadgram:
+    """
+    Quadgramm-Modell: log10-Wahrscheinlichkeit für jede der 26⁴ Buchstabenfolgen der Länge 4,
+    gespeichert als flaches array('d') mit Index a*26³ + b*26² + c*26 + d.
+    """
+
+    def __init__(self, table: array):
+        """
+        Konstruktor
+
+        :param table: array('d') mit SIZE log10-Wahrscheinlichkeiten
+        """
+        if len(table) != SIZE:
+            raise ValueError(f"table must have {SIZE} entries.")
+        self.__table = table
+
+    @property
+    def table(self) -> array:
+        """
+        Die Tabelle der log10-Wahrscheinlichkeiten.
+        """
+        return self.__table
+
+    @classmethod
+    def from_text(cls, text: str) -> 'Quadgram':
+        """
+        Zählt alle Quadgramme eines (deutschen) Korpus. Nicht vorkommende Quadgramme erhalten
+        die Wahrscheinlichkeit 0.01 / Anzahl. Der Korpus wird wie die Geheimtexte normalisiert
+        (Umlaute und ß fallen weg), sonst passen die Quadgramme um Umlaute nicht zusammen.
+        >>> q = Quadgram.from_text("Hallo Hallo")
+        >>> q.score(b"hall") > q.score(b"xqzv")
+        True
+
+        :param text: Korpus
+        :return: Quadgram-Modell
+        """
+        data = normalizer.letters_only(text).translate(TO_NUMBERS)
+        counts = array('d', bytes(8 * SIZE))
+        for i in range(len(data) - 3):
+            counts[data[i] * 17576 + data[i + 1] * 676 + data[i + 2] * 26 + data[i + 3]] += 1
+
+        total = max(sum(counts), 1)
+        floor = math.log10(0.01 / total)
+        return cls(array('d', (math.log10(c / total) if c else floor for c in counts)))
+
+    @classmethod
+    def load(cls, path: str) -> 'Quadgram':
+        """
+        Lädt eine mit save gespeicherte Tabelle.
+
+        :param path: Pfad zur Binärdatei
+        :return: Quadgram-Modell
+        """
+        table = array('d')
+        with open(path, 'rb') as f:
+            table.fromfile(f, SIZE)
+        return cls(table)
+
+    def save(self, path: str):
+        """
+        Speichert die Tabelle als Binärdatei (SIZE doubles).
+
+        :param path: Pfad zur Binärdatei
+        """
+        with open(path, 'wb') as f:
+            self.__table.tofile(f)
+
+    @classmethod
+    def load_or_build(cls, corpus: str, cache: str = None) -> 'Quadgram':
+        """
+        Lädt das Modell aus cache, falls die Datei neuer als der Korpus ist, sonst wird es aus dem
+        Korpus gebaut und in cache gespeichert.
+
+        :param corpus: Pfad zum Korpus (Textdatei)
+        :param cache: Pfad zur Binärdatei (Standard: corpus + '.v2.quadgram', siehe MODEL_VERSION)
+        :return: Quadgram-Modell
+        """
+        cache = cache or f"{corpus}.v{MODEL_VERSION}.quadgram"
+        if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(corpus):
+            return cls.load(cache)
+
+        with open(corpus, 'r', encoding='utf-8') as f:
+            model = cls.from_text(f.read())
+        model.save(cache)
+        return model
+
+    def quadgram_scores(self, numbers: bytes) -> list[float]:
+        """
+        Liefert den Score jedes Quadgramms einer Folge von Buchstabennummern (0..25).
+
+        :param numbers: Text als bytes mit Werten 0..25
+        :return: Liste mit len(numbers) - 3 Scores
+        """
+        t = self.__table
+        return [t[numbers[i] * 17576 + numbers[i + 1] * 676 + numbers[i + 2] * 26 + numbers[i + 3]]
+                for i in range(len(numbers) - 3)]
+
+    def score(self, data: bytes) -> float:
+        """
+        Log-Likelihood eines normalisierten Textes (bytes mit a..z). Größer = deutscher.
+
+        :param data: normalisierter Text
+        :return: Summe der log10-Wahrscheinlichkeiten aller Quadgramme
+        """
+        return sum(self.quadgram_scores(data.translate(TO_NUMBERS)))
@@ -11,6 +11,7 @@ __status__ = "Finished"
 
 from collections import Counter
 from Caesar import Caesar
+import normalizer
 
 
 class Vigenere:
@@ -34,24 +35,112 @@ class Vigenere:
 
     #key: chr = property(get_key)
 
-    def encrypt(self, plaintext: str, key: str = None) -> str:
+    def _shift_bytes(self, data: bytes, shifts: list[int], offset: int = 0, inplace: bool = False) -> bytes:
+        """
+        Verschiebt jede Spalte (alle Zeichen mit gleichem Schlüsselbuchstaben) mit einem
+        einzigen bytes.translate und fügt die Spalten per Slice-Zuweisung wieder zusammen.
+
+        :param data: normalisierter Text als bytes (nur a..z)
+        :param shifts: Verschiebung je Schlüsselbuchstabe (0..25)
+        :param offset: Position im Schlüssel, mit der data beginnt
+        :param inplace: True, um die Spalten direkt in data (bytearray) zurückzuschreiben
+        :return: verschobener Text als bytes (bzw. data selbst)
+        """
+        n = len(shifts)
+        out = data if inplace else bytearray(len(data))
+        for i, shift in enumerate(shifts):
+            start = (i - offset) % n
+            out[start::n] = data[start::n].translate(Caesar._byte_tables[shift])
+        return out if inplace else bytes(out)
+
+    def _key_shifts(self, key: str) -> list[int]:
+        """
+        Wandelt den Schlüssel in eine Liste von Verschiebungen um.
+
+        >>> Vigenere()._key_shifts("Ab-C")
+        [0, 1, 2]
+        >>> Vigenere()._key_shifts("123")
+        Traceback (most recent call last):
+        ...
+        ValueError: key must contain at least one letter
+
+        :param key: Schlüssel
+        :return: Verschiebungen 0..25
+        """
+        shifts = [ord(c) - ord('a') for c in normalizer.to_lowercase_letter_only(key)]
+        if not shifts:
+            raise ValueError("key must contain at least one letter")
+        return shifts
+
+    def encrypt_bytes(self, data: bytes, key: str = None, offset: int = 0, inplace: bool = False) -> bytes:
+        """
+        Bulk-Verschlüsselung eines bereits normalisierten Textes (bytes mit a..z).
+        offset gibt an, bei welchem Schlüsselbuchstaben data beginnt, damit lange
+        Texte auch stückweise verschlüsselt werden können. Mit inplace=True wird ein
+        bytearray (z.B. normalizer.Letters) spaltenweise an Ort und Stelle verschlüsselt.
+
+        >>> v = Vigenere()
+        >>> v.encrypt_bytes(b"hallo", "abc")
+        b'hbnlp'
+        >>> v.encrypt_bytes(b"lo", "abc", 3)
+        b'lp'
+
+        :param data: normalisierter Text
+        :param key: Schlüssel
+        :param offset: Startposition im Schlüssel
+        :param inplace: True, um data (bytearray) selbst zu verändern
+        :return: Verschlüsselter Text als bytes
+        """
+        if key is None:
+            key = self.__key
+
+        return self._shift_bytes(data, self._key_shifts(key), offset, inplace)
+
+    def decrypt_bytes(self, data: bytes, key: str = None, offset: int = 0, inplace: bool = False) -> bytes:
+        """
+        Bulk-Entschlüsselung eines normalisierten Textes (bytes mit a..z).
+
+        >>> Vigenere().decrypt_bytes(b"hbnlp", "abc")
+        b'hallo'
+        >>> data = bytearray(b"hbnlp")
+        >>> Vigenere().decrypt_bytes(data, "abc", inplace=True) is data, data
+        (True, bytearray(b'hallo'))
+
+        :param data: normalisierter Geheimtext
+        :param key: Schlüssel
+        :param offset: Startposition im Schlüssel
+        :param inplace: True, um data (bytearray) selbst zu verändern
+        :return: Entschlüsselter Text als bytes
+        """
+        if key is None:
+            key = self.__key
+
+        return self._shift_bytes(data, [(26 - s) % 26 for s in self._key_shifts(key)], offset, inplace)
+
+    def encrypt(self, plaintext: str, key: str = None, bulk: bool = True) -> str:
         """
         Diese Methode verschlüsselt einen Text mit dem Vigenere-Verfahren.
 
         >>> en = Vigenere()
         >>> en.encrypt("Franz jagt im komplett verwahrlosten Taxi quer durch Bayern.", "StrengGeheim")
         'xkrrmpgkamuwgfgprzzzlvemzkcsfzkraefuinvvqaxgofikwke'
+        >>> en.encrypt("Franz jagt im komplett verwahrlosten Taxi quer durch Bayern.", "StrengGeheim", bulk=False)
+        'xkrrmpgkamuwgfgprzzzlvemzkcsfzkraefuinvvqaxgofikwke'
 
         :param plaintext: zu verschlüsselnder Text
         :param key: Schlüssel
+        :param bulk: True für die Bulk-Variante über bytes, False für die zeichenweise Variante
         :return: Verschlüsselter Text
         """
 
         if key is None:
             key = self.__key
 
-        key = Caesar().to_lowercase_letter_only(key)
-        plaintext = Caesar().to_lowercase_letter_only(plaintext)
+        if bulk:
+            return self.encrypt_bytes(normalizer.to_letter_bytes(plaintext), key).decode('ascii')
+
+        key = normalizer.to_lowercase_letter_only(key)
+        plaintext = normalizer.to_lowercase_letter_only(plaintext)
 
         c = Caesar()
         for i in range(len(plaintext)):
@@ -60,24 +149,30 @@ class Vigenere:
         return plaintext
 
 
-    def decrypt(self, crypttext: str, key: str = None) -> str:
+    def decrypt(self, crypttext: str, key: str = None, bulk: bool = True) -> str:
         """
         Diese Methode verschlüsselt einen Text mit dem Vigenere-Verfahren.
 
         >>> de = Vigenere()
         >>> de.decrypt("xkrrmpgkamuwgfgprzzzlvemzkcsfzkraefuinvvqaxgofikwke", "StrengGeheim")
         'franzjagtimkomplettverwahrlostentaxiquerdurchbayern'
+        >>> de.decrypt("xkrrmpgkamuwgfgprzzzlvemzkcsfzkraefuinvvqaxgofikwke", "StrengGeheim", bulk=False)
+        'franzjagtimkomplettverwahrlostentaxiquerdurchbayern'
 
         :param plaintext: zu verschlüsselnder Text
         :param key: Schlüssel
+        :param bulk: True für die Bulk-Variante über bytes, False für die zeichenweise Variante
         :return: Verschlüsselter Text
         """
 
         if key is None:
             key = self.__key
 
-        key = Caesar().to_lowercase_letter_only(key)
-        crypttext = Caesar().to_lowercase_letter_only(crypttext)
+        if bulk:
+            return self.decrypt_bytes(normalizer.to_letter_bytes(crypttext), key).decode('ascii')
+
+        key = normalizer.to_lowercase_letter_only(key)
+        crypttext = normalizer.to_lowercase_letter_only(crypttext)
 
         c = Caesar()
         for i in range(len(crypttext)):
@@ -0,0 +1,227 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+import normalizer
+from Caesar import Caesar
+from Vigenere import Vigenere
+from Kasiski import Kasiski
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000]
+
+WORDS = ['der', 'die', 'und', 'in', 'den', 'von', 'zu', 'das', 'mit', 'sich', 'des', 'auf', 'für', 'ist', 'im',
+         'dem', 'nicht', 'ein', 'eine', 'als', 'auch', 'es', 'an', 'werden', 'aus', 'er', 'hat', 'dass', 'sie',
+         'nach', 'wird', 'bei', 'einer', 'um', 'am', 'sind', 'noch', 'wie', 'einem', 'über', 'einen', 'so',
+         'zum', 'war', 'haben', 'nur', 'oder', 'aber', 'vor', 'zur', 'bis', 'mehr', 'durch', 'man', 'sein',
+         'wurde', 'sei', 'Geheimnis', 'Botschaft', 'Schlüssel', 'Treffen', 'Mitternacht', 'Nachricht', 'Wald',
+         'Haus', 'Zeit', 'Jahr', 'Stadt', 'Mensch', 'Arbeit', 'Kinder', 'Straße', 'gehen', 'kommen', 'sehen',
+         'wissen', 'machen', 'sagen', 'finden', 'bleiben', 'heute', 'morgen', 'schnell', 'wichtig', 'genau']
+
+BLOCK_SIZE = 1 << 20
+
+
+def german_text(size: int, seed: int = 0) -> str:
+    """
+    Erzeugt einen deutsch-ähnlichen Text (zufällige Wörter aus WORDS) mit genau size Zeichen.
+    >>> len(german_text(1234))
+    1234
+
+    :param size: Länge in Zeichen
+    :param seed: Startwert für den Zufallsgenerator
+    :return: Text
+    """
+    rng = random.Random(seed)
+    blocks = []
+    length = 0
+    while length < size:
+        block = ' '.join(rng.choices(WORDS, k=min(size, BLOCK_SIZE) // 5 + 1)) + '. '
+        blocks.append(block)
+        length += len(block)
+    return ''.join(blocks)[:size]
+
+
+def operations(key: str) -> dict:
+    """
+    Liefert die zu messenden Operationen als dict name -> (vorbereitung, funktion).
+    Die Vorbereitung wird nicht mitgemessen (z.B. Verschlüsseln vor dem Knacken).
+
+    :param key: Vigenere-Schlüssel
+    :return: dict mit den Operationen
+    """
+    c = Caesar()
+    v = Vigenere()
+    return {
+        'caesar_encrypt': (lambda t: t, lambda t: c.encrypt(t, 'k')),
+        'caesar_decrypt': (lambda t: c.encrypt(t, 'k'), lambda t: c.decrypt(t, 'k')),
+        'caesar_crack': (lambda t: c.encrypt(t, 'k'), lambda t: c.crack(t)),
+        'vigenere_encrypt': (lambda t: t, lambda t: v.encrypt(t, key)),
+        'vigenere_decrypt': (lambda t: v.encrypt(t, key), lambda t: v.decrypt(t, key)),
+        'vigenere_crack': (lambda t: v.encrypt(t, key), lambda t: Kasiski(t).crack_key(len(key))),
+        'key_length': (lambda t: v.encrypt(t, key), lambda t: Kasiski().estimate_key_length(t)),
+    }
+
+
+def clear_caches():
+    """
+    Leert den Zwischenspeicher des normalizer, damit jede Wiederholung neu normalisiert.
+    """
+    normalizer.cache_clear()
+
+
+def measure(prepare, run, text: str, repeat: int = 3) -> tuple[float, int]:
+    """
+    Misst die beste Laufzeit aus repeat Durchläufen und den Spitzenspeicher eines weiteren Durchlaufs.
+
+    :return: (sekunden, peak_bytes)
+    """
+    data = prepare(text)
+    best = math.inf
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        run(data)
+        best = min(best, time.perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def scaling_exponent(sizes: list[int], seconds: list[float]) -> float:
+    """
+    Steigung der Regressionsgeraden von log(zeit) über log(größe); 1.0 = linear, 2.0 = quadratisch.
+    >>> round(scaling_exponent([10, 100, 1000], [1, 100, 10000]), 2)
+    2.0
+    >>> scaling_exponent([10], [1])
+    0.0
+
+    :param sizes: Eingabegrößen
+    :param seconds: gemessene Laufzeiten
+    :return: Skalierungsexponent
+    """
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, seconds) if t > 0]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var if var else 0.0
+
+
+def run_benchmarks(sizes: list[int], key: str = 'gustavo', repeat: int = 3, only: list[str] = None,
+                   log=sys.stderr) -> dict:
+    """
+    Führt alle Operationen für alle Größen aus und liefert die Ergebnisse als dict.
+
+    :param sizes: Eingabegrößen in Zeichen
+    :param key: Vigenere-Schlüssel
+    :param repeat: Wiederholungen pro Messung
+    :param only: optional nur diese Operationen messen
+    :param log: Ausgabe für den Fortschritt (None = keine)
+    :return: {'sizes': ..., 'results': {operation: {'runs': [...], 'scaling': ...}}}
+    """
+    ops = operations(key)
+    if only:
+        ops = {name: op for name, op in ops.items() if name in only}
+
+    results = {name: {'runs': []} for name in ops}
+    for size in sizes:
+        text = german_text(size)
+        for name, (prepare, run) in ops.items():
+            seconds, peak = measure(prepare, run, text, repeat)
+            mb_s = size / 1e6 / seconds if seconds > 0 else math.inf
+            results[name]['runs'].append({'size': size, 'seconds': seconds, 'mb_per_s': mb_s, 'peak_bytes': peak})
+            if log:
+                print(f"{name:18} {size:>11} B {seconds:10.4f} s {mb_s:10.2f} MB/s {peak / 1e6:10.2f} MB peak",
+                      file=log)
+
+    for name, result in results.items():
+        result['scaling'] = scaling_exponent([r['size'] for r in result['runs']],
+                                             [r['seconds'] for r in result['runs']])
+    return {'sizes': sizes, 'key': key, 'results': results}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Vergleicht den Durchsatz mit einem früheren Lauf und liefert alle Operationen/Größen,
+    die um mehr als threshold Prozent langsamer geworden sind.
+    >>> old = {'results': {'x': {'runs': [{'size': 10, 'mb_per_s': 100.0}]}}}
+    >>> new = {'results': {'x': {'runs': [{'size': 10, 'mb_per_s': 80.0}]}}}
+    >>> compare(new, old, 10)
+    ['x @ 10 B: 80.00 MB/s vs. 100.00 MB/s (-20.0 %)']
+    >>> compare(new, old, 25)
+    []
+
+    :param current: aktuelles Ergebnis
+    :param baseline: Vergleichsergebnis
+    :param threshold: erlaubte Verlangsamung in Prozent
+    :return: Liste der Regressionen
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        old_runs = {r['size']: r for r in baseline.get('results', {}).get(name, {}).get('runs', [])}
+        for run in result['runs']:
+            old = old_runs.get(run['size'])
+            if old is None or not old['mb_per_s']:
+                continue
+            change = (run['mb_per_s'] - old['mb_per_s']) / old['mb_per_s'] * 100
+            if change < -threshold:
+                regressions.append(f"{name} @ {run['size']} B: {run['mb_per_s']:.2f} MB/s vs. "
+                                   f"{old['mb_per_s']:.2f} MB/s ({change:.1f} %)")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark für Caesar, Vigenere und Kasiski.")
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=SIZES, help='Eingabegrößen in Zeichen')
+    parser.add_argument('-m', '--max-size', type=int, help='Nur Größen bis zu diesem Wert messen')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Wiederholungen pro Messung')
+    parser.add_argument('-k', '--key', type=str, default='gustavo', help='Vigenere-Schlüssel')
+    parser.add_argument('--only', nargs='+', help='Nur diese Operationen messen')
+    parser.add_argument('-o', '--output', type=str, help='Ergebnis als JSON in diese Datei schreiben')
+    parser.add_argument('-b', '--baseline', type=str, help='JSON eines früheren Laufs zum Vergleich')
+    parser.add_argument('-t', '--threshold', type=float, default=10.0,
+                        help='Erlaubte Verlangsamung gegenüber der Baseline in Prozent')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sizes = [s for s in args.sizes if args.max_size is None or s <= args.max_size]
+    result = run_benchmarks(sizes, args.key, args.repeat, args.only)
+
+    for name, data in result['results'].items():
+        print(f"{name:18} scaling exponent {data['scaling']:.2f}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
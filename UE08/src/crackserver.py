@@ -0,0 +1,316 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from Caesar import Caesar
+from Vigenere import Vigenere
+from CrackCache import DEFAULT_PATH as DEFAULT_CACHE
+import cvcrack
+
+DEFAULT_ADDRESS = 'localhost:8765'
+# Maximal so viele Aufträge warten auf einen Worker, danach liest der Server nicht mehr vom Socket.
+QUEUE_SIZE = 64
+# Maximale Länge einer JSON-Zeile (Texte werden direkt mitgeschickt, große Dateien besser als Pfad).
+MAX_LINE = 64 << 20
+
+# Korpus, Wortliste und Cache des Servers (werden pro Worker von warm_up gesetzt). Aufträge dürfen diese
+# Pfade nicht selbst angeben, sonst könnte ein Client Dateien an beliebigen Orten anlegen lassen.
+_options = {'corpus': None, 'wordlist': None, 'cache': None}
+
+
+def parse_address(address: str) -> tuple:
+    """
+    Zerlegt eine Adresse in 'unix:PFAD' oder 'HOST:PORT'. Über TCP sind nur lokale Adressen erlaubt.
+    >>> parse_address('unix:/tmp/cvcrack.sock')
+    ('unix', '/tmp/cvcrack.sock')
+    >>> parse_address('localhost:8765'), parse_address('[::1]:8765')
+    (('tcp', 'localhost', 8765), ('tcp', '::1', 8765))
+    >>> parse_address('0.0.0.0:8765')
+    Traceback (most recent call last):
+    ...
+    ValueError: only loopback addresses are allowed: 0.0.0.0:8765
+
+    :param address: Adresse
+    :return: ('unix', pfad) oder ('tcp', host, port)
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[5:]
+    host, _, port = address.rpartition(':')
+    if not port.isdigit():
+        raise ValueError(f"invalid address: {address}")
+    host = host.strip('[]') or 'localhost'
+    if host != 'localhost':
+        try:
+            loopback = ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            loopback = False
+        if not loopback:
+            raise ValueError(f"only loopback addresses are allowed: {address}")
+    return 'tcp', host, int(port)
+
+
+def warm_up(corpus: str = None, wordlist: str = None, cache: str = None):
+    """
+    Initialisierung eines Worker-Prozesses: merkt sich die Optionen des Servers, Quadgramm-Modell und
+    Wortliste werden einmal geladen und bleiben über die lru_caches von cvcrack für alle weiteren
+    Aufträge im Speicher.
+
+    :param corpus: Korpus für das Quadgramm-Modell (None = keines)
+    :param wordlist: Wortliste (None = keine)
+    :param cache: Pfad zum Ergebnis-Cache (None = keiner)
+    """
+    _options.update(corpus=corpus, wordlist=wordlist, cache=cache)
+    if corpus:
+        cvcrack.load_model(corpus)
+    if wordlist:
+        cvcrack.load_words(wordlist)
+
+
+def handle_job(job: dict) -> dict:
+    """
+    Führt einen Auftrag im Worker-Prozess aus. Fehler werden als 'error' zurückgeliefert.
+    Korpus, Wortliste und Cache kommen aus den Optionen des Servers (warm_up), nicht aus dem Auftrag.
+    >>> handle_job({'id': 1, 'op': 'encrypt', 'cipher': 'caesar', 'text': 'hallo', 'key': 'b'})
+    {'id': 1, 'text': 'ibmmp'}
+    >>> handle_job({'id': 2, 'op': 'crack', 'text': 'osxqkxjqogyorxvsmrobnoedcmrobckdj'})['key']
+    'k'
+    >>> handle_job({'id': 3, 'op': 'sleep'})
+    {'id': 3, 'error': 'unknown op: sleep'}
+
+    :param job: dict mit op ('crack', 'encrypt' oder 'decrypt') und den Optionen des Auftrags
+    :return: dict mit dem Ergebnis
+    """
+    op = job.get('op', 'crack')
+    result = {'id': job.get('id')}
+    try:
+        if op == 'crack':
+            cipher = job.get('cipher', 'caesar')
+            keylen = job.get('keylen', 'ioc')
+            if 'file' in job:
+                result.update(cvcrack.crack_file(job['file'], cipher, keylen, job.get('sample'), _options['corpus'],
+                                                 _options['wordlist'], _options['cache']))
+            else:
+                key, score = cvcrack.crack_text(job['text'], cipher, keylen, _options['corpus'],
+                                                _options['wordlist'])
+                result.update({'key': key, 'score': round(score, 4)})
+        elif op in ['encrypt', 'decrypt']:
+            cipher = Caesar() if job.get('cipher', 'caesar') in ['caesar', 'c'] else Vigenere()
+            crypt = cipher.encrypt if op == 'encrypt' else cipher.decrypt
+            result['text'] = crypt(job['text'], job['key'])
+        else:
+            result['error'] = f"unknown op: {op}"
+    except KeyError as e:
+        result['error'] = f"missing field: {e.args[0]}"
+    except (OSError, ValueError, IndexError) as e:
+        result['error'] = str(e)
+    return result
+
+
+class CrackServer:
+    """
+    Asynchroner Server für Crack- und Verschlüsselungsaufträge. Die Aufträge kommen als JSON-Zeilen
+    über einen Unix-Socket oder localhost-TCP, landen in einer begrenzten Warteschlange und werden
+    in einem ProcessPoolExecutor mit vorgewärmten Workern abgearbeitet. Die Ergebnisse werden
+    sofort nach Fertigstellung (also nicht unbedingt in Reihenfolge, siehe 'id') zurückgeschickt.
+    Ist die Warteschlange voll, liest der Server keine weiteren Zeilen mehr vom Client.
+    """
+
+    def __init__(self, jobs: int = None, queue_size: int = QUEUE_SIZE, corpus: str = None, wordlist: str = None,
+                 cache: str = None, verbose: bool = False):
+        """
+        Konstruktor
+
+        :param jobs: Anzahl der Worker-Prozesse (None = Anzahl der CPUs)
+        :param queue_size: maximale Anzahl wartender Aufträge
+        :param corpus: Korpus, dessen Quadgramm-Modell vorab geladen und für alle Aufträge verwendet wird
+        :param wordlist: Wortliste, die vorab geladen und für alle Aufträge verwendet wird
+        :param cache: Pfad zum Ergebnis-Cache (None = keiner)
+        :param verbose: jeden erledigten Auftrag auf stderr ausgeben
+        """
+        self.__jobs = jobs or os.cpu_count() or 1
+        self.__queue_size = queue_size
+        self.__corpus = corpus
+        self.__wordlist = wordlist
+        self.__cache = cache
+        self.__verbose = verbose
+        self.__queue = None
+        self.__executor = None
+
+    async def serve(self, address: str = DEFAULT_ADDRESS):
+        """
+        Startet die Worker und beantwortet Verbindungen, bis der Task abgebrochen wird.
+
+        :param address: 'unix:PFAD' oder 'HOST:PORT'
+        """
+        self.__queue = asyncio.Queue(self.__queue_size)
+        # spawn statt fork: ein geforkter Worker würde die offenen Client-Sockets erben und offen halten.
+        self.__executor = ProcessPoolExecutor(self.__jobs, multiprocessing.get_context('spawn'), warm_up,
+                                              (self.__corpus, self.__wordlist, self.__cache))
+        consumers = [asyncio.create_task(self.__consume()) for _ in range(self.__jobs)]
+        kind, *where = parse_address(address)
+        try:
+            if kind == 'unix':
+                if os.path.exists(where[0]):
+                    os.unlink(where[0])
+                server = await asyncio.start_unix_server(self.handle_connection, where[0], limit=MAX_LINE)
+            else:
+                server = await asyncio.start_server(self.handle_connection, *where, limit=MAX_LINE)
+            async with server:
+                if self.__verbose:
+                    print(f"Listening on {address} with {self.__jobs} workers", file=sys.stderr)
+                await server.serve_forever()
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+            self.__executor.shutdown(cancel_futures=True)
+            if kind == 'unix' and os.path.exists(where[0]):
+                os.unlink(where[0])
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Liest die Aufträge eines Clients zeilenweise und schickt jedes Ergebnis als JSON-Zeile zurück.
+        Nach dem Ende der Eingabe (EOF) wird auf die offenen Aufträge gewartet, dann wird geschlossen.
+
+        :param reader: Eingabe des Clients
+        :param writer: Ausgabe an den Client
+        """
+        loop = asyncio.get_running_loop()
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def respond(result):
+            if isinstance(result, asyncio.Future):
+                result = await result
+            async with lock:
+                writer.write((json.dumps(result) + '\n').encode())
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    job = json.loads(line)
+                    if not isinstance(job, dict):
+                        raise ValueError("job must be a JSON object")
+                except ValueError as e:
+                    await respond({'id': None, 'error': f"invalid job: {e}"})
+                    continue
+                future = loop.create_future()
+                # Blockiert, solange die Warteschlange voll ist: Backpressure bis zum Client.
+                await self.__queue.put((job, future))
+                task = asyncio.create_task(respond(future))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            for task in pending:
+                task.cancel()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __consume(self):
+        """
+        Holt Aufträge aus der Warteschlange und führt sie im Prozesspool aus.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            job, future = await self.__queue.get()
+            try:
+                result = await loop.run_in_executor(self.__executor, handle_job, job)
+            except Exception as e:
+                result = {'id': job.get('id'), 'error': f"{type(e).__name__}: {e}"}
+            if not future.done():
+                future.set_result(result)
+            if self.__verbose:
+                print(json.dumps(result), file=sys.stderr)
+            self.__queue.task_done()
+
+
+async def submit(address: str, jobs, on_result) -> int:
+    """
+    Client: schickt Aufträge an einen laufenden CrackServer und ruft on_result für jedes Ergebnis auf,
+    sobald es eintrifft. Senden und Empfangen laufen gleichzeitig, damit die Backpressure des Servers
+    nicht zu einer Verklemmung führt.
+
+    :param address: 'unix:PFAD' oder 'HOST:PORT'
+    :param jobs: iterierbare Folge von Auftrags-dicts
+    :param on_result: Funktion, die jedes Ergebnis-dict bekommt
+    :return: Anzahl der Ergebnisse
+    """
+    kind, *where = parse_address(address)
+    if kind == 'unix':
+        reader, writer = await asyncio.open_unix_connection(where[0], limit=MAX_LINE)
+    else:
+        reader, writer = await asyncio.open_connection(*where, limit=MAX_LINE)
+
+    async def send():
+        for job in jobs:
+            writer.write((json.dumps(job) + '\n').encode())
+            await writer.drain()
+        writer.write_eof()
+
+    sender = asyncio.create_task(send())
+    count = 0
+    try:
+        while line := await reader.readline():
+            on_result(json.loads(line))
+            count += 1
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve Caesar/Vigenere cracking and encryption jobs "
+                                                 "(one JSON object per line) from a warm process pool.")
+    parser.add_argument('-a', '--address', type=str, default=DEFAULT_ADDRESS,
+                        help="Listen on HOST:PORT or on a Unix socket (unix:PATH)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help='Maximum number of waiting jobs before clients are throttled')
+    parser.add_argument('-r', '--refine', type=str, metavar='CORPUS',
+                        help='Refine Vigenere keys with the quadgram model of this corpus (preloaded in every worker)')
+    parser.add_argument('-w', '--wordlist', type=str,
+                        help='Search Vigenere keys in this word list (preloaded in every worker)')
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE, help='Result cache database')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the result cache')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every finished job to stderr')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        parse_address(args.address)
+    except ValueError as e:
+        sys.exit(f"crackserver: {e}")
+    server = CrackServer(args.jobs, args.queue_size, args.refine, args.wordlist,
+                         None if args.no_cache else args.cache, args.verbose)
+    try:
+        asyncio.run(server.serve(args.address))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,495 @@
 """
 __author__ = "Paul Waldecker"
 __email__ = "0157@htl.rennweg.at"
-__version__ = "1.8"
+__version__ = "2.1"
 __copyright__ = "Copyright 2024"
 __license__ = "GPL"
 __status__ = "Development"
 """
 import argparse
+import errno
+import glob
+import json
+import mmap
+import random
+import sqlite3
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 from Kasiski import Kasiski
 from Caesar import Caesar
+from Quadgram import Quadgram
+from CrackCache import CrackCache, digest_file, DEFAULT_PATH as DEFAULT_CACHE
+import normalizer
+import profiling
 
+# Nach so vielen Dateien pro Worker wird der Prozesspool neu gestartet, damit der Speicher pro Worker begrenzt bleibt.
+MAX_TASKS_PER_WORKER = 200
+
+# Ab dieser Dateigröße wird Caesar standardmäßig stichprobenartig geknackt.
+SAMPLE_THRESHOLD = 64 << 20
+SAMPLE_BLOCK_SIZE = 64 << 10
+
+# Muss erhöht werden, sobald sich die Ergebnisse der Crack-Algorithmen ändern (macht den Cache ungültig).
+ALGORITHM_VERSION = '3'
+
+
+def find_key_length(cipher: Kasiski, crypttext: str, method: str = 'ioc') -> int:
+    """
+    Bestimmt die Schlüssellänge mit der gewählten Methode. Findet 'ggt' oder 'divisor' keine
+    wiederholten Trigramme, wird wie bei 'ioc' geschätzt.
+    >>> find_key_length(Kasiski(), 'kurz', 'divisor'), find_key_length(Kasiski(), 'kurz', 'ggt')
+    (1, 1)
+
+    :param cipher: Kasiski-Objekt
+    :param crypttext: Geheimtext
+    :param method: 'ioc', 'ggt', 'divisor' oder 'autocorrelation'
+    :return: Schlüssellänge
+    """
+    if method in ['ggt', 'divisor']:
+        if isinstance(crypttext, normalizer.Letters):
+            # Der n-Gramm-Index braucht hashbare Teilstrings.
+            crypttext = crypttext.decode('ascii')
+        with profiling.current.stage('ngrams', max(len(crypttext) - 2, 0)):
+            distances = cipher.dist_n_list(crypttext, 3)
+        profiling.current.count('distances', len(distances))
+        if method == 'ggt':
+            with profiling.current.stage('ggt', len(distances)):
+                counts = cipher.ggt_count(distances)
+            if counts:
+                return counts.most_common(1)[0][0]
+        else:
+            with profiling.current.stage('divisors', len(distances)):
+                laenge = cipher.divisor_key_length(distances)
+            if laenge:
+                return laenge
+        # Keine (brauchbaren) Wiederholungen, z.B. bei kurzen Texten: Schätzung über den Koinzidenzindex.
+
+    with profiling.current.stage('keylength'):
+        if method == 'autocorrelation':
+            return cipher.autocorrelation_key_length(crypttext)
+        return cipher.estimate_key_length(crypttext)
+
+
+@lru_cache(maxsize=4)
+def load_model(corpus: str) -> Quadgram:
+    """
+    Lädt das Quadgramm-Modell eines Korpus einmal pro Prozess (siehe Quadgram.load_or_build).
+
+    :param corpus: Pfad zum Korpus
+    :return: Quadgram-Modell
+    """
+    return Quadgram.load_or_build(corpus)
+
+
+@lru_cache(maxsize=2)
+def load_words(path: str) -> dict[int, list[str]]:
+    """
+    Liest eine Wortliste mit spellcheck.load_words (UE06, verwendet die kompilierte Wortliste)
+    einmal pro Prozess und gruppiert die normalisierten Wörter nach ihrer Länge.
+
+    :param path: Pfad zur Wortliste
+    :return: dict laenge -> Wörter
+    """
+    spellcheck_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'UE06', 'src')
+    if spellcheck_dir not in sys.path:
+        sys.path.append(spellcheck_dir)
+    from spellcheck import load_words as load_compiled_words
+
+    words = load_compiled_words(path)
+    if words is FileNotFoundError:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+    by_length = {}
+    for word in {normalizer.letters_only(word).decode('ascii') for word in words}:
+        by_length.setdefault(len(word), []).append(word)
+    return by_length
+
+
+def dictionary_keys(crypttext: str, wordlist: str, keylen: str = 'ioc', top: int = 10) -> list[tuple[str, float]]:
+    """
+    Sucht den Vigenere-Schlüssel in einer Wortliste: alle Wörter mit der geschätzten Schlüssellänge
+    werden bewertet (Kasiski.dictionary_keys), die top besten werden geliefert.
+
+    :param crypttext: Geheimtext
+    :param wordlist: Pfad zur Wortliste
+    :param keylen: Methode zur Bestimmung der Schlüssellänge
+    :param top: Anzahl der gelieferten Schlüssel
+    :return: nach Score sortierte Liste von (schluessel, score)
+    """
+    k = Kasiski(crypttext)
+    laenge = find_key_length(k, crypttext, keylen)
+    return k.dictionary_keys(load_words(wordlist).get(laenge, []), laenge, top)
+
+
+def crack_text(crypttext: str, cipher: str, keylen: str = 'ioc', corpus: str = None,
+               wordlist: str = None) -> tuple[str, float]:
+    """
+    Knackt einen Geheimtext und liefert den Schlüssel und dessen Chi-Quadrat-Score (kleiner = besser).
+    >>> crack_text(Caesar().encrypt("Ein ganz gewoehnlicher deutscher Satz", "k"), 'caesar')[0]
+    'k'
+    >>> crack_text(normalizer.Letters(Caesar().encrypt("Ein ganz gewoehnlicher deutscher Satz", "k").encode()), 'c')[0]
+    'k'
+
+    :param crypttext: Geheimtext (str oder bereits normalisiert als normalizer.Letters)
+    :param cipher: 'caesar' oder 'vigenere'
+    :param keylen: Methode zur Bestimmung der Schlüssellänge (nur Vigenere)
+    :param corpus: Korpus für die Quadgramm-Verfeinerung des Vigenere-Schlüssels (None = keine)
+    :param wordlist: Wortliste; der Vigenere-Schlüssel wird dann unter ihren Wörtern gesucht (None = keine)
+    :return: (schluessel, score)
+    """
+    with profiling.current.stage('normalize', len(crypttext)):
+        letters = normalizer.to_letter_bytes(crypttext)
+
+    if cipher in ['caesar', 'c']:
+        c = Caesar()
+        with profiling.current.stage('crack', len(letters)):
+            counts = c.letter_counts(letters)
+            key = ''.join(c.crack_counts(counts))
+        with profiling.current.stage('score', len(letters)):
+            return key, c.chi_squared(counts, key)
+
+    k = Kasiski(crypttext)
+    if wordlist:
+        with profiling.current.stage('dictionary'):
+            candidates = dictionary_keys(crypttext, wordlist, keylen, 1)
+        if candidates:
+            key = candidates[0][0]
+            with profiling.current.stage('score', len(letters)):
+                return key, k.key_score(key)
+
+    laenge = find_key_length(k, crypttext, keylen)
+    with profiling.current.stage('columns', laenge):
+        key = k.crack_key(laenge)
+    if corpus:
+        with profiling.current.stage('refine', len(letters)):
+            key = k.refine_key(key, load_model(corpus))
+    with profiling.current.stage('score', len(letters)):
+        return key, k.key_score(key)
+
+
+def mmap_blocks(path: str, block_size: int = SAMPLE_BLOCK_SIZE, windows: bool = False, seed: int = 0):
+    """
+    Liefert die Datei blockweise aus einem mmap, entweder der Reihe nach oder (windows=True)
+    als zufällig gewählte Fenster ohne Wiederholung.
+
+    :param path: Pfad zur Datei
+    :param block_size: Blockgröße in Bytes
+    :param windows: True für zufällige Fenster
+    :param seed: Startwert für die Zufallsreihenfolge
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            starts = list(range(0, len(m), block_size))
+            if windows:
+                random.Random(seed).shuffle(starts)
+            for start in starts:
+                yield m[start:start + block_size]
+
+
+@lru_cache(maxsize=2)
+def open_cache(path: str) -> CrackCache:
+    """
+    Öffnet den Ergebnis-Cache einmal pro Prozess.
+
+    :param path: Pfad zur Datenbank
+    :return: CrackCache
+    """
+    return CrackCache(path)
+
+
+def crack_path(path: str, cipher: str, keylen: str = 'ioc', sample: bool = None,
+               corpus: str = None, wordlist: str = None, cache: str = None) -> tuple[str, float, int, bool]:
+    """
+    Knackt eine Datei. Caesar-Dateien ab SAMPLE_THRESHOLD Bytes werden stichprobenartig
+    (Caesar.crack_sampled über zufällige mmap-Fenster) geknackt, außer sample=False.
+
+    :param path: Pfad zur Datei
+    :param cipher: 'caesar' oder 'vigenere'
+    :param keylen: Methode zur Bestimmung der Schlüssellänge
+    :param sample: None = automatisch nach Dateigröße, True/False erzwingt bzw. verbietet Stichproben
+    :param corpus: siehe crack_text
+    :param wordlist: siehe crack_text
+    :param cache: Pfad zum Ergebnis-Cache (None = kein Cache). Stichproben-Cracks werden nicht gecacht.
+        Ist der Cache nicht verfügbar (z.B. 'database is locked'), wird ohne ihn geknackt.
+    :return: (schluessel, score, gelesene_bytes, aus_cache)
+    """
+    size = os.path.getsize(path)
+    if cipher in ['caesar', 'c'] and (sample or (sample is None and size >= SAMPLE_THRESHOLD)):
+        with profiling.current.stage('sampled'):
+            result = Caesar().crack_sampled(mmap_blocks(path, windows=True))
+        profiling.current.count('sampled', result[2])
+        return *result, False
+
+    if cache:
+        with profiling.current.stage('digest', size):
+            digest, size = digest_file(path)
+        cipher = 'caesar' if cipher in ['caesar', 'c'] else 'vigenere'
+        mode = cipher if cipher == 'caesar' else f"{cipher}:{keylen}:{corpus or ''}:{wordlist or ''}"
+        with profiling.current.stage('cache'):
+            try:
+                hit = open_cache(cache).get(digest, mode, ALGORITHM_VERSION)
+            except sqlite3.Error:
+                hit = None
+        if hit is not None:
+            return *hit, size, True
+
+    with profiling.current.stage('read', size):
+        letters = normalizer.map_letters(path)
+    key, score = crack_text(letters, cipher, keylen, corpus, wordlist)
+
+    if cache:
+        try:
+            open_cache(cache).put(digest, mode, ALGORITHM_VERSION, key, score)
+        except sqlite3.Error:
+            pass
+    return key, score, size, False
+
+
+def crack_file(path: str, cipher: str, keylen: str = 'ioc', sample: bool = None, corpus: str = None,
+               wordlist: str = None, cache: str = None) -> dict:
+    """
+    Knackt eine einzelne Datei und liefert das Ergebnis als dict (eine Zeile im Batch-Modus).
+
+    :param path: Pfad zur Datei
+    :param cipher: 'caesar' oder 'vigenere'
+    :param keylen: Methode zur Bestimmung der Schlüssellänge
+    :param sample: siehe crack_path
+    :param corpus: siehe crack_text
+    :param wordlist: siehe crack_text
+    :param cache: siehe crack_path
+    :return: dict mit file, cipher, key, score, bytes, cached und time (bzw. error statt key)
+    >>> result = crack_file('/nonexistent/file.txt', 'c')
+    >>> result['file'], 'key' in result, result['error']
+    ('/nonexistent/file.txt', False, "[Errno 2] No such file or directory: '/nonexistent/file.txt'")
+    """
+    start = time.perf_counter()
+    cipher = 'caesar' if cipher in ['caesar', 'c'] else 'vigenere'
+    try:
+        key, score, consumed, cached = crack_path(path, cipher, keylen, sample, corpus, wordlist, cache)
+        result = {'file': path, 'cipher': cipher, 'key': key, 'score': round(score, 4), 'bytes': consumed,
+                  'cached': cached}
+    except (OSError, ValueError, IndexError, ArithmeticError, sqlite3.Error) as e:
+        # Eine fehlerhafte Datei darf den Batch nicht abbrechen (UnicodeDecodeError ist ein ValueError).
+        result = {'file': path, 'cipher': cipher, 'error': str(e)}
+    result['time'] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def expand_inputs(inputs: list[str]) -> list[str]:
+    """
+    Löst Verzeichnisse (alle Dateien darin) und Glob-Muster zu einer sortierten Dateiliste auf.
+
+    :param inputs: Dateien, Verzeichnisse oder Glob-Muster
+    :return: Liste der Dateien
+    """
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            files.extend(sorted(os.path.join(entry, name) for name in os.listdir(entry)
+                                if os.path.isfile(os.path.join(entry, name))))
+        elif glob.has_magic(entry):
+            files.extend(sorted(path for path in glob.glob(entry, recursive=True) if os.path.isfile(path)))
+        else:
+            files.append(entry)
+    return files
+
+
+def crack_batch(files: list[str], cipher: str, keylen: str, out, jobs: int = None, sample: bool = None,
+                corpus: str = None, wordlist: str = None, cache: str = None) -> int:
+    """
+    Verteilt die Dateien auf einen ProcessPoolExecutor und schreibt pro Datei eine JSON-Zeile nach out.
+
+    :param files: zu knackende Dateien
+    :param cipher: 'caesar' oder 'vigenere'
+    :param keylen: Methode zur Bestimmung der Schlüssellänge
+    :param out: Ausgabe (Textdatei-Objekt)
+    :param jobs: Anzahl der Worker-Prozesse (None = Anzahl der CPUs)
+    :param sample: siehe crack_path
+    :param corpus: siehe crack_text
+    :param wordlist: siehe crack_text
+    :param cache: siehe crack_path
+    :return: Anzahl der fehlgeschlagenen Dateien
+    """
+    errors = 0
+    jobs = jobs or os.cpu_count() or 1
+    # Ein neuer Pool pro Runde statt max_tasks_per_child: das bleibt unter Python 3.11 hängen,
+    # sobald der erste Worker ersetzt wird.
+    step = jobs * MAX_TASKS_PER_WORKER
+    for start in range(0, len(files), step):
+        part = files[start:start + step]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for result in executor.map(crack_file, part, [cipher] * len(part), [keylen] * len(part),
+                                       [sample] * len(part), [corpus] * len(part), [wordlist] * len(part),
+                                       [cache] * len(part), chunksize=8):
+                if 'error' in result:
+                    errors += 1
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+    return errors
 
 
 def main():
     args = parse_args()
-    cipher = Caesar() if args.cipher in ['caesar', 'c'] else Kasiski()
+    with profiling.profile(args.profile, args.profile_json, args.pstats):
+        run(args)
 
-    try:
-        with open(args.infile, 'r') as f:
-            plaintext = f.read()
 
-        if args.cipher in ['caesar', 'c']:
-            key = cipher.crack(plaintext)
-            key = ''.join(key)
+def run(args):
+    cache = None if args.no_cache else args.cache
 
-            if args.verbose:
-                print(f"Cracking {args.cipher.title()}-encrypted file {args.infile}: Key = {key}")
-            else:
-                print(key)
+    if args.connect:
+        sys.exit(run_remote(args))
 
-            if args.outfile:
-                with open(args.outfile, 'w') as f:
-                    f.write(key)
-        if args.cipher in ['vigenere', 'v']:
-            cipher = Kasiski(plaintext)
-            len = cipher.ggt_count([cipher.dist_n_list(plaintext, i) for i in range(3, 10)][0]).most_common(1)[0][0]
-            key = cipher.crack_key(len)
+    if args.batch:
+        out = open(args.outfile, 'w') if args.outfile else sys.stdout
+        try:
+            errors = crack_batch(expand_inputs(args.infile), args.cipher, args.keylen, out, args.jobs, args.sample,
+                                 args.refine, args.wordlist, cache)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        sys.exit(1 if errors else 0)
 
-            if args.verbose:
-                print(f"Cracking {args.cipher.title()}-encrypted file {args.infile}: Key = {key}")
-            else:
-                print(key)
+    if len(args.infile) != 1:
+        print("Multiple input files require --batch", file=sys.stderr)
+        sys.exit(2)
+    infile = args.infile[0]
 
+    try:
+        if args.wordlist and args.cipher in ['vigenere', 'v'] and args.top > 1:
+            candidates = dictionary_keys(normalizer.map_letters(infile), args.wordlist, args.keylen, args.top)
+            if not args.quiet:
+                for key, score in candidates:
+                    print(f"{key}\t{score:.4f}")
+            if args.outfile and candidates:
+                with open(args.outfile, 'w') as f:
+                    f.write(candidates[0][0])
+            return
 
+        key, _, consumed, cached = crack_path(infile, args.cipher, args.keylen, args.sample, args.refine,
+                                              args.wordlist, cache)
+        report_key(args, infile, key, consumed, cached)
 
-    except FileNotFoundError:
-        print(f"{args.infile}: No such file or directory", file=sys.stderr)
+    except FileNotFoundError as e:
+        print(f"{e.filename or infile}: No such file or directory", file=sys.stderr)
         sys.exit(1)
 
 
+def report_key(args, infile: str, key: str, consumed: int, cached: bool):
+    """
+    Gibt den Schlüssel einer einzelnen Datei je nach --verbose/--quiet aus und schreibt ihn in --outfile.
+
+    :param args: Kommandozeilenargumente
+    :param infile: geknackte Datei
+    :param key: gefundener Schlüssel
+    :param consumed: gelesene Bytes
+    :param cached: True, wenn das Ergebnis aus dem Cache kommt
+    """
+    if args.verbose:
+        print(f"Cracking {args.cipher.title()}-encrypted file {infile}: Key = {key} ({consumed} bytes read"
+              f"{', cached' if cached else ''})")
+    elif not args.quiet:
+        print(key)
+
+    if args.outfile:
+        with open(args.outfile, 'w') as f:
+            f.write(key)
+
+
+def run_remote(args) -> int:
+    """
+    Client-Modus: schickt die Dateien als Aufträge an einen laufenden crackserver und gibt die
+    Ergebnisse aus, sobald sie eintreffen (im Batch-Modus als JSON-Zeilen). Korpus, Wortliste
+    und Cache bestimmt der Server selbst.
+
+    :param args: Kommandozeilenargumente
+    :return: Exit-Code
+    """
+    import asyncio
+    from crackserver import submit
+
+    files = expand_inputs(args.infile) if args.batch else args.infile[:1]
+    jobs = [{'id': i, 'op': 'crack', 'file': os.path.abspath(path), 'cipher': args.cipher, 'keylen': args.keylen,
+             'sample': args.sample}
+            for i, path in enumerate(files)]
+    # Einzelne Datei: Ausgabe wie beim lokalen Knacken (report_key), nur im Batch-Modus JSON-Zeilen.
+    out = (open(args.outfile, 'w') if args.outfile else sys.stdout) if args.batch else None
+    errors = []
+
+    def on_result(result):
+        result['file'] = files[result['id']]
+        if 'error' in result:
+            errors.append(result)
+        if args.batch:
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+        elif 'error' not in result:
+            report_key(args, result['file'], result['key'], result.get('bytes'), result.get('cached'))
+
+    try:
+        asyncio.run(submit(args.connect, jobs, on_result))
+    except OSError as e:
+        print(f"{args.connect}: {e.strerror or e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        if out not in [None, sys.stdout]:
+            out.close()
+
+    if errors and not args.batch:
+        print(f"{errors[0]['file']}: {errors[0]['error']}", file=sys.stderr)
+    return 1 if errors else 0
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Crack Caesar or Vigenere ciphers.")
-    parser.add_argument("infile", type=str, help="File to crack")
+    parser.add_argument("infile", type=str, nargs='+',
+                        help="File to crack (with --batch: files, directories or glob patterns)")
     parser.add_argument('-c', '--cipher', choices=['caesar', 'c', 'vigenere', 'v'], default='c',
                         help='Cipher to use')
+    parser.add_argument('-l', '--keylen', choices=['ioc', 'ggt', 'divisor', 'autocorrelation'], default='ioc',
+                        help='Key length estimation: index of coincidence, gcd or divisor histogram of repeat distances, '
+                             'or autocorrelation profile')
+    parser.add_argument('-o', '--outfile', type=str, help='Write the key (or the JSON lines in batch mode) to this file')
+    parser.add_argument('-b', '--batch', action='store_true',
+                        help='Crack many files in a process pool and print one JSON line per file')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes in batch mode')
+    parser.add_argument('-r', '--refine', type=str, metavar='CORPUS',
+                        help='Refine the Vigenere key by quadgram hill climbing, using a German corpus file')
+    parser.add_argument('-w', '--wordlist', type=str,
+                        help='Search the Vigenere key among the words of this word list (read via spellcheck)')
+    parser.add_argument('-t', '--top', type=int, default=1,
+                        help='With --wordlist: print the best TOP keys with their scores')
+    parser.add_argument('--connect', type=str, metavar='ADDRESS',
+                        help='Send the job to a running crackserver (HOST:PORT or unix:PATH) instead of cracking locally; '
+                             "the server's own --refine, --wordlist and --cache apply")
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE, help='Result cache database')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the result cache')
+    parser.add_argument('--profile', action='store_true', help='Print a per-stage timing table to stderr '
+                                                                 '(batch mode: only stages of the main process)')
+    parser.add_argument('--profile-json', type=str, metavar='FILE', help="Write per-stage timings as JSON ('-' = stdout)")
+    parser.add_argument('--pstats', type=str, metavar='FILE', help='Dump a cProfile .pstats file for the whole run')
+    sample_group = parser.add_mutually_exclusive_group()
+    sample_group.add_argument('--sample', dest='sample', action='store_true', default=None,
+                              help='Crack Caesar from random blocks and stop once the result is certain '
+                                   f'(default for files >= {SAMPLE_THRESHOLD >> 20} MB)')
+    sample_group.add_argument('--full', dest='sample', action='store_false',
+                              help='Always count the whole file')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
     parser.add_argument('-q', '--quiet', action='store_true', help='Quiet mode, suppress output')
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
-    if not os.path.exists(args.infile):
-        print(f"{args.infile}: No such file or directory", file=sys.stderr)
+    if not args.batch and not os.path.exists(args.infile[0]):
+        print(f"{args.infile[0]}: No such file or directory", file=sys.stderr)
         sys.exit(1)
     main()
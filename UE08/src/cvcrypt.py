@@ -1,22 +1,28 @@
 """
 __author__ = "Paul Waldecker"
 __email__ = "0157@htl.rennweg.at"
-__version__ = "1.4"
+__version__ = "1.6"
 __copyright__ = "Copyright 2024"
 __license__ = "GPL"
 __status__ = "Development"
 """
 
+import os
 import sys
 import argparse
 from Kasiski import Kasiski
 from Caesar import Caesar
 from Vigenere import Vigenere
+import normalizer
+import profiling
+
+CHUNK_SIZE = 1 << 20
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Verschlüsselt oder entschlüsselt eine Datei mit einer Caesar- oder Vigenère-Chiffre.")
-    parser.add_argument("infile", type=str, help="Zu verschlüsselnde Datei")
-    parser.add_argument("outfile", type=str, nargs='?',  help="Zieldatei")
+    parser.add_argument("infile", type=str, help="Zu verschlüsselnde Datei ('-' für stdin)")
+    parser.add_argument("outfile", type=str, nargs='?',  help="Zieldatei ('-' oder leer für stdout im Streaming-Modus)")
 
     output_group = parser.add_mutually_exclusive_group()
     crypto_group = parser.add_mutually_exclusive_group()
@@ -27,30 +33,109 @@ def parse_args():
     crypto_group.add_argument('-d', '--decrypt', action='store_true', help='Entschlüssle die Eingabe')
     crypto_group.add_argument('-e', '--encrypt', action='store_true', help='Verschlüssele die Eingabe')
     parser.add_argument('-k', '--key', type=str, required=True, help='Verschlüsselung-Key')
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help='Eingabe blockweise verarbeiten (konstanter Speicherbedarf, stdin/stdout möglich)')
+    parser.add_argument('--profile', action='store_true', help='Laufzeit pro Stufe als Tabelle nach stderr ausgeben')
+    parser.add_argument('--profile-json', type=str, metavar='FILE',
+                        help="Laufzeit pro Stufe als JSON in FILE schreiben ('-' = stdout)")
+    parser.add_argument('--pstats', type=str, metavar='FILE', help='cProfile-Ausgabe des ganzen Laufs in FILE speichern')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Blockgröße im Streaming-Modus (Zeichen)')
     return parser.parse_args()
 
+
+def stream_crypt(cipher, infile, outfile, key: str, decrypt: bool = False, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Liest infile blockweise, normalisiert jeden Block und schreibt ihn verschlüsselt nach outfile.
+    Bei Vigenere wird die Position im Schlüssel über die Blockgrenzen mitgeführt, das Ergebnis
+    ist daher identisch mit dem Verschlüsseln der ganzen Datei.
+    >>> import io
+    >>> text = "Franz jagt im komplett verwahrlosten Taxi quer durch Bayern."
+    >>> out = io.StringIO()
+    >>> stream_crypt(Vigenere(), io.StringIO(text), out, "StrengGeheim", chunk_size=7)
+    51
+    >>> out.getvalue() == Vigenere().encrypt(text, "StrengGeheim")
+    True
+    >>> out = io.StringIO()
+    >>> stream_crypt(Caesar(), io.StringIO("Hallo Welt"), out, "b", decrypt=True, chunk_size=3)
+    9
+    >>> out.getvalue()
+    'gzkknvdks'
+
+    :param cipher: Caesar- oder Vigenere-Objekt
+    :param infile: Eingabe (Textdatei-Objekt)
+    :param outfile: Ausgabe (Textdatei-Objekt)
+    :param key: Schlüssel
+    :param decrypt: True zum Entschlüsseln
+    :param chunk_size: Anzahl der Zeichen, die pro Block gelesen werden
+    :return: Anzahl der geschriebenen Buchstaben
+    """
+    written = 0
+    while True:
+        with profiling.current.stage('read'):
+            chunk = infile.read(chunk_size)
+        if not chunk:
+            break
+        with profiling.current.stage('normalize', len(chunk)):
+            data = normalizer.letters_only(chunk)
+        with profiling.current.stage('decrypt' if decrypt else 'encrypt', len(data)):
+            # Der Block ist schon normalisiert: direkt über bytes, ohne den (gecachten) Normalizer.
+            if isinstance(cipher, Vigenere):
+                crypt = cipher.decrypt_bytes if decrypt else cipher.encrypt_bytes
+                data = crypt(data, key, written)
+            else:
+                data = cipher.decrypt_bytes(data, key) if decrypt else cipher.encrypt_bytes(data, key)
+            chunk = data.decode('ascii')
+        with profiling.current.stage('write', len(chunk)):
+            outfile.write(chunk)
+        written += len(chunk)
+    return written
+
+
 def main():
     args = parse_args()
+    with profiling.profile(args.profile, args.profile_json, args.pstats):
+        run(args)
+
+
+def run(args):
     cipher = Caesar() if args.cipher in ['caesar', 'c'] else Vigenere()
 
     try:
-        with open(args.infile, 'r') as f:
-            plaintext = f.read()
-        if args.decrypt:
-            crypttext = cipher.decrypt(plaintext, args.key)
+        if args.stream:
+            infile = sys.stdin if args.infile == '-' else open(args.infile, 'r')
+            outfile = sys.stdout if args.outfile in [None, '-'] else open(args.outfile, 'w')
+            try:
+                stream_crypt(cipher, infile, outfile, args.key, args.decrypt, args.chunk_size)
+            finally:
+                if infile is not sys.stdin:
+                    infile.close()
+                if outfile is not sys.stdout:
+                    outfile.close()
         else:
-            crypttext = cipher.encrypt(plaintext, args.key)
+            # Die Datei wird gemappt und direkt als bytes normalisiert, danach an Ort und Stelle verschlüsselt.
+            with profiling.current.stage('normalize', os.path.getsize(args.infile)):
+                letters = normalizer.map_letters(args.infile)
+            with profiling.current.stage('decrypt' if args.decrypt else 'encrypt', len(letters)):
+                if args.decrypt:
+                    cipher.decrypt_bytes(letters, args.key, inplace=True)
+                else:
+                    cipher.encrypt_bytes(letters, args.key, inplace=True)
 
-        with open(args.outfile, 'w') as f:
-            f.write(crypttext)
+            with profiling.current.stage('write', len(letters)):
+                with open(args.outfile, 'wb') as f:
+                    f.write(letters)
 
         if args.verbose:
             print(
-                f"{'Decrypting' if args.decrypt else 'Encrypting'} {args.cipher.title()} with key = {args.key} from file {args.infile} into file {args.outfile or args.infile}")
+                f"{'Decrypting' if args.decrypt else 'Encrypting'} {args.cipher.title()} with key = {args.key} from file {args.infile} into file {args.outfile or args.infile}",
+                file=sys.stderr if args.stream else sys.stdout)
 
     except FileNotFoundError:
         print(f"{args.infile}: No such file or directory", file=sys.stderr)
         sys.exit(1)
+    except ValueError as e:
+        print(f"{args.key}: {e}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
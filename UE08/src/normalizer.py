@@ -0,0 +1,202 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import mmap
+import os
+import string
+from functools import lru_cache
+
+# bytes-Tabelle: Großbuchstaben -> Kleinbuchstaben, alle anderen ASCII-Zeichen werden gelöscht.
+_LOWER_TABLE = bytes.maketrans(string.ascii_uppercase.encode(), string.ascii_lowercase.encode())
+_NON_LETTERS = bytes(c for c in range(256) if chr(c) not in string.ascii_letters)
+
+# Ersetzungen für deutsche Umlaute und ß.
+_UMLAUT_TABLE = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'Ä': 'Ae', 'Ö': 'Oe', 'Ü': 'Ue', 'ß': 'ss',
+                               'ẞ': 'SS'})
+
+# UTF-8-Kodierungen der Umlaute und ß für letters_from_bytes.
+_UMLAUT_BYTES = [(k.encode(), v.encode()) for k, v in
+                 {'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'Ä': 'Ae', 'Ö': 'Oe', 'Ü': 'Ue', 'ß': 'ss', 'ẞ': 'SS'}.items()]
+
+# Anzahl der zuletzt normalisierten Texte, die zwischengespeichert werden.
+CACHE_SIZE = 8
+
+# Längere Texte werden nicht zwischengespeichert: der Cache hält Eingabe und Ergebnisse fest,
+# so bleibt er auf wenige MB begrenzt (wichtig z.B. für die langlebigen Worker von crackserver).
+CACHE_MAX_LENGTH = 1 << 20
+
+# Blockgröße, in der map_letters die gemappte Datei normalisiert.
+BLOCK_SIZE = 1 << 20
+
+
+class Letters(bytearray):
+    """
+    Bereits normalisierter Text (nur a..z) als bytearray, z.B. von map_letters. to_letter_bytes und
+    to_lowercase_letter_only geben ihn ohne erneutes Normalisieren und ohne Kopie weiter, daher kann er
+    überall verwendet werden, wo ein Geheimtext als str erwartet wird und nur normalisiert gelesen wird.
+    """
+
+
+def letters_only(text: str, fold_umlauts: bool = False) -> bytes:
+    """
+    Wandelt text in Kleinbuchstaben um und entfernt alle Zeichen außer a..z in einem Durchlauf
+    (encode + bytes.translate). Ohne Zwischenspeicher, z.B. für Blöcke beim Streaming.
+    >>> letters_only("Hallo, Welt!")
+    b'hallowelt'
+    >>> letters_only("Größe Übel")
+    b'grebel'
+    >>> letters_only("Größe Übel", True)
+    b'groesseuebel'
+
+    :param text: Eingabetext
+    :param fold_umlauts: True, um ä/ö/ü/ß als ae/oe/ue/ss zu behalten statt sie zu entfernen
+    :return: normalisierter Text als bytes
+    """
+    if fold_umlauts:
+        text = text.translate(_UMLAUT_TABLE)
+    return text.encode('ascii', 'ignore').translate(_LOWER_TABLE, _NON_LETTERS)
+
+
+def letters_from_bytes(data: bytes, fold_umlauts: bool = False) -> bytes:
+    """
+    Wie letters_only, arbeitet aber direkt auf (UTF-8-)bytes, z.B. aus einer Datei oder einem mmap,
+    ohne vorher einen str zu dekodieren. Bytes >= 0x80 sind nie Buchstaben a..z und werden gelöscht.
+    >>> letters_from_bytes("Größe Übel!".encode())
+    b'grebel'
+    >>> letters_from_bytes("Größe Übel!".encode(), True)
+    b'groesseuebel'
+
+    :param data: Eingabe als bytes (oder bytes-ähnliches Objekt)
+    :param fold_umlauts: True, um Umlaute und ß umzuschreiben
+    :return: normalisierter Text als bytes
+    """
+    if fold_umlauts:
+        data = bytes(data)
+        for umlaut, replacement in _UMLAUT_BYTES:
+            data = data.replace(umlaut, replacement)
+    return bytes(data).translate(_LOWER_TABLE, _NON_LETTERS)
+
+
+def map_letters(path: str, fold_umlauts: bool = False, block_size: int = BLOCK_SIZE) -> Letters:
+    """
+    Liest eine (UTF-8-)Datei über ein mmap und normalisiert sie blockweise direkt aus dem Mapping
+    (letters_from_bytes). Es entsteht nie ein str und nie eine Kopie der ganzen Datei, der Speicherbedarf
+    ist also etwa eine Kopie der Buchstaben plus ein Block. Blockgrenzen werden so verschoben, dass
+    kein UTF-8-Zeichen geteilt wird; dafür ist ein Block mindestens 4 Bytes (ein ganzes Zeichen) groß.
+    Nicht mapbare Dateien (z.B. Pipes) werden als Ganzes gelesen.
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile(delete=False) as f:
+    ...     _ = f.write("Größe Übel, Straße!".encode())
+    >>> map_letters(f.name, block_size=3)
+    Letters(b'grebelstrae')
+    >>> map_letters(f.name, True, block_size=3)
+    Letters(b'groesseuebelstrasse')
+    >>> with open(f.name, 'wb') as g:
+    ...     _ = g.write("aẞbẞẞc".encode())
+    >>> [map_letters(f.name, True, block_size=n) for n in (1, 2, 5)]
+    [Letters(b'assbssssc'), Letters(b'assbssssc'), Letters(b'assbssssc')]
+    >>> os.unlink(f.name)
+
+    :param path: Pfad zur Datei
+    :param fold_umlauts: True, um Umlaute und ß umzuschreiben
+    :param block_size: Blockgröße in Bytes
+    :return: normalisierter Text
+    """
+    letters = Letters()
+    block_size = max(block_size, 4)
+    with open(path, 'rb') as f:
+        try:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Leere Datei oder kein reguläres File.
+            letters += letters_from_bytes(f.read(), fold_umlauts)
+            return letters
+
+        with m:
+            start = released = 0
+            while start < len(m):
+                end = min(start + block_size, len(m))
+                # UTF-8-Folgebytes (10xxxxxx) gehören noch zum Zeichen davor, das höchstens 3 Bytes davor beginnt.
+                for _ in range(3):
+                    if end == len(m) or not 0x80 <= m[end] < 0xc0:
+                        break
+                    end -= 1
+                letters += letters_from_bytes(m[start:end], fold_umlauts)
+                start = end
+                # Bereits gelesene Seiten freigeben, damit sie nicht zusätzlich im Speicher des Prozesses liegen.
+                aligned = end - end % mmap.PAGESIZE
+                if hasattr(mmap, 'MADV_DONTNEED') and aligned > released:
+                    m.madvise(mmap.MADV_DONTNEED, released, aligned - released)
+                    released = aligned
+    return letters
+
+
+def to_letter_bytes(text: str, fold_umlauts: bool = False) -> bytes:
+    """
+    Wie letters_only, merkt sich aber die zuletzt normalisierten Texte (bis CACHE_MAX_LENGTH Zeichen).
+    Wiederholte Aufrufe mit demselben String kosten daher nur noch einen Hash-Lookup. Letters werden
+    unverändert geliefert.
+    >>> to_letter_bytes("Hallo, Welt!")
+    b'hallowelt'
+    >>> cache_clear(); _ = to_letter_bytes("x" * (CACHE_MAX_LENGTH + 1))
+    >>> _cached_letter_bytes.cache_info().currsize
+    0
+    >>> letters = Letters(b"hallo")
+    >>> to_letter_bytes(letters) is letters
+    True
+
+    :param text: Eingabetext oder Letters
+    :param fold_umlauts: True, um Umlaute und ß umzuschreiben
+    :return: normalisierter Text als bytes
+    """
+    if isinstance(text, Letters):
+        return text
+    if len(text) > CACHE_MAX_LENGTH:
+        return letters_only(text, fold_umlauts)
+    return _cached_letter_bytes(text, fold_umlauts)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_letter_bytes(text: str, fold_umlauts: bool = False) -> bytes:
+    return letters_only(text, fold_umlauts)
+
+
+def to_lowercase_letter_only(text: str, fold_umlauts: bool = False) -> str:
+    """
+    Wandelt text in Kleinbuchstaben um und entfernt alle Zeichen, die keine Kleinbuchstaben
+    aus dem Bereich [a..z] sind. Die Ergebnisse werden wie bei to_letter_bytes zwischengespeichert.
+    >>> to_lowercase_letter_only("Wandelt den plaintext in Kleinbuchstaben um [a..z].")
+    'wandeltdenplaintextinkleinbuchstabenumaz'
+    >>> to_lowercase_letter_only("Straße", True)
+    'strasse'
+    >>> to_lowercase_letter_only(Letters(b"hallo"))
+    'hallo'
+
+    :param text: Eingabetext oder Letters
+    :param fold_umlauts: True, um Umlaute und ß umzuschreiben
+    :return: normalisierter Text
+    """
+    if isinstance(text, Letters):
+        return text.decode('ascii')
+    if len(text) > CACHE_MAX_LENGTH:
+        return letters_only(text, fold_umlauts).decode('ascii')
+    return _cached_lowercase_letter_only(text, fold_umlauts)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_lowercase_letter_only(text: str, fold_umlauts: bool = False) -> str:
+    return _cached_letter_bytes(text, fold_umlauts).decode('ascii')
+
+
+def cache_clear():
+    """
+    Leert die Zwischenspeicher von to_letter_bytes und to_lowercase_letter_only.
+    """
+    _cached_letter_bytes.cache_clear()
+    _cached_lowercase_letter_only.cache_clear()
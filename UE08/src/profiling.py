@@ -0,0 +1,139 @@
+"""
+__author__ = "Paul Waldecker"
+__email__ = "0157@htl.rennweg.at"
+__version__ = "1.0"
+__copyright__ = "Copyright 2024"
+__license__ = "GPL"
+__status__ = "Development"
+"""
+
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class NullProfiler:
+    """
+    Profiler, der nichts misst. Wird verwendet, solange kein Profiling aktiviert ist,
+    damit die Messpunkte im Code praktisch nichts kosten.
+    """
+
+    _context = nullcontext()
+
+    def stage(self, name: str, items: int = 0):
+        """
+        Liefert einen leeren Kontextmanager.
+        """
+        return self._context
+
+    def count(self, name: str, items: int):
+        """
+        Tut nichts.
+        """
+
+
+class Profiler:
+    """
+    Misst pro Stufe (z.B. Lesen, Normalisieren, n-Gramm-Suche) die Laufzeit mit perf_counter_ns,
+    die Anzahl der Aufrufe und die Anzahl der verarbeiteten Elemente.
+    """
+
+    def __init__(self):
+        """
+        Konstruktor
+        """
+        self.__stages = {}
+
+    def __entry(self, name: str) -> list:
+        return self.__stages.setdefault(name, [0, 0, 0])
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0):
+        """
+        Misst die Laufzeit des with-Blocks als Stufe name.
+        >>> p = Profiler()
+        >>> with p.stage('read', 10):
+        ...     pass
+        >>> p.to_dict()['read']['calls'], p.to_dict()['read']['items']
+        (1, 10)
+
+        :param name: Name der Stufe
+        :param items: Anzahl der verarbeiteten Elemente
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            entry = self.__entry(name)
+            entry[0] += time.perf_counter_ns() - start
+            entry[1] += 1
+            entry[2] += items
+
+    def count(self, name: str, items: int):
+        """
+        Zählt nachträglich verarbeitete Elemente zu einer Stufe dazu.
+        >>> p = Profiler()
+        >>> p.count('distances', 5)
+        >>> p.to_dict()['distances']['items']
+        5
+        """
+        self.__entry(name)[2] += items
+
+    def to_dict(self) -> dict:
+        """
+        Ergebnis als dict: stufe -> {'ns', 'calls', 'items'}.
+        """
+        return {name: {'ns': ns, 'calls': calls, 'items': items}
+                for name, (ns, calls, items) in self.__stages.items()}
+
+    def summary(self) -> str:
+        """
+        Ergebnis als Tabelle.
+        """
+        total = sum(ns for ns, _, _ in self.__stages.values()) or 1
+        lines = [f"{'stage':16} {'ms':>12} {'%':>6} {'calls':>8} {'items':>14}"]
+        for name, (ns, calls, items) in self.__stages.items():
+            lines.append(f"{name:16} {ns / 1e6:12.3f} {100 * ns / total:6.1f} {calls:8} {items:14}")
+        return '\n'.join(lines)
+
+
+# Der aktuell aktive Profiler; die Messpunkte rufen profiling.current.stage(...) auf.
+current = NullProfiler()
+
+
+@contextmanager
+def profile(table: bool = False, json_file: str = None, pstats_file: str = None):
+    """
+    Aktiviert das Profiling für den with-Block und gibt danach die Tabelle (stderr) bzw. JSON aus.
+    Optional wird der ganze Block zusätzlich mit cProfile gemessen und als .pstats gespeichert.
+    Ohne Optionen bleibt der NullProfiler aktiv.
+
+    :param table: Tabelle nach stderr schreiben
+    :param json_file: Pfad für das JSON-Ergebnis ('-' = stdout)
+    :param pstats_file: Pfad für die cProfile-Ausgabe
+    """
+    global current
+    if not (table or json_file or pstats_file):
+        yield
+        return
+
+    current = Profiler()
+    cprofile = cProfile.Profile() if pstats_file else None
+    if cprofile:
+        cprofile.enable()
+    try:
+        yield
+    finally:
+        if cprofile:
+            cprofile.disable()
+            cprofile.dump_stats(pstats_file)
+        if table:
+            print(current.summary(), file=sys.stderr)
+        if json_file == '-':
+            print(json.dumps(current.to_dict()))
+        elif json_file:
+            with open(json_file, 'w') as f:
+                json.dump(current.to_dict(), f, indent=2)
+        current = NullProfiler()